@@ -0,0 +1 @@
+"""Offline benchmarks for the blog graph; see benchmarks/run.py."""
@@ -0,0 +1,241 @@
+"""In-process stand-ins for the LLM, Tavily and the Excalidraw MCP server."""
+
+import asyncio
+import hashlib
+import random
+import time
+import zlib
+from pathlib import Path
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import StructuredTool
+from pydantic import BaseModel, Field
+from src.models import (
+    DiagramSpec,
+    EvalResult,
+    Plan,
+    ResearchResult,
+    SearchPlan,
+    SectionPatch,
+    SectionQueries,
+    Task,
+    TopicCheck,
+)
+from src.tools.renderers import MIN_IMAGE_BYTES, _render_on_canvas
+
+WORDS = "latency throughput broker partition replica consumer offset schema".split()
+
+
+class Profile(BaseModel):
+    """Latency and size distributions for the fakes.
+
+    Latencies are log-normal around their median (``sigma`` is the spread);
+    token counts are normal around their mean.
+    """
+
+    sections: int = 5
+    research_every: int = 2
+    image_every: int = 3
+    llm_latency: float = 0.05
+    llm_sigma: float = 0.5
+    output_tokens: int = 400
+    search_latency: float = 0.02
+    tool_latency: float = 0.01
+    seed: int = 0
+
+
+class FakeChatModel(BaseChatModel):
+    """Answers every call after a sampled delay, with canned structured outputs
+    sized by the profile. Bound to tools, it asks for one web_search per
+    conversation before answering. Like a provider's prompt cache, it reports
+    the longest run of leading messages it has seen before as cache reads."""
+
+    model_name: str = "fake"
+    profile: Profile
+    tools_bound: bool = False
+    rng: random.Random
+    # Shared with tool-bound copies, like a provider-side cache.
+    seen_prefixes: set = Field(default_factory=set)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _latency(self) -> float:
+        return self.rng.lognormvariate(0, self.profile.llm_sigma) * self.profile.llm_latency
+
+    def _usage(self, messages, output_tokens: int) -> dict:
+        digest = hashlib.sha256()
+        chars = cached_chars = 0
+        for m in messages:
+            digest.update(f"{m.type}\0{m.content}\0".encode())
+            chars += len(str(m.content))
+            prefix = digest.hexdigest()
+            if prefix in self.seen_prefixes:
+                cached_chars = chars
+            self.seen_prefixes.add(prefix)
+        input_tokens = chars // 4
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+            "input_token_details": {"cache_read": cached_chars // 4},
+        }
+
+    def _text(self) -> tuple[str, int]:
+        mean = self.profile.output_tokens
+        tokens = max(1, int(self.rng.gauss(mean, mean / 4)))
+        words = [self.rng.choice(WORDS) for _ in range(int(tokens * 0.75))]
+        paragraphs = [" ".join(words[i : i + 40]) for i in range(0, len(words), 40)]
+        return "\n\n".join(paragraphs), tokens
+
+    def _respond(self, messages) -> ChatResult:
+        if self.tools_bound and not any(isinstance(m, ToolMessage) for m in messages):
+            message = AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": "web_search",
+                        "args": {"query": str(messages[-1].content)[:60]},
+                        "id": f"call_{self.rng.getrandbits(32):x}",
+                    }
+                ],
+                usage_metadata=self._usage(messages, 20),
+            )
+        else:
+            content, tokens = self._text()
+            message = AIMessage(content=content, usage_metadata=self._usage(messages, tokens))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self._latency())
+        return self._respond(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self._latency())
+        return self._respond(messages)
+
+    def bind_tools(self, tools, **kwargs):
+        return self.model_copy(update={"tools_bound": True})
+
+    def with_structured_output(self, schema, include_raw: bool = False, **kwargs):
+        def structured(messages):
+            parsed = self._canned(schema)
+            output_tokens = len(parsed.model_dump_json()) // 4
+            raw = AIMessage(content="", usage_metadata=self._usage(messages, output_tokens))
+            if not include_raw:
+                return parsed
+            return {"raw": raw, "parsed": parsed, "parsing_error": None}
+
+        def respond(messages):
+            time.sleep(self._latency())
+            return structured(messages)
+
+        async def arespond(messages):
+            await asyncio.sleep(self._latency())
+            return structured(messages)
+
+        return RunnableLambda(respond, afunc=arespond)
+
+    def _canned(self, schema) -> BaseModel:
+        p = self.profile
+        tasks = [
+            Task(
+                id=i,
+                title=f"Section {i}",
+                brief=f"What section {i} covers",
+                needs_research=i % p.research_every == 0,
+                needs_image=i % p.image_every == 0,
+            )
+            for i in range(p.sections)
+        ]
+        if schema is TopicCheck:
+            return TopicCheck(is_technical=True, reason="")
+        if schema is Plan:
+            return Plan(blog_title="Benchmark Blog", tasks=tasks)
+        if schema is SearchPlan:
+            return SearchPlan(
+                sections=[
+                    SectionQueries(
+                        section_title=t.title,
+                        queries=[f"{t.title} overview", f"{t.title} benchmarks"],
+                    )
+                    for t in tasks
+                    if t.needs_research
+                ]
+            )
+        if schema is ResearchResult:
+            return ResearchResult(
+                section_title="",
+                sources=[f"https://example.com/{i}" for i in range(3)],
+                key_findings=[self._text()[0][:200] for _ in range(3)],
+            )
+        if schema is DiagramSpec:
+            return DiagramSpec(
+                mermaid_code="flowchart LR\n  A[Producer] --> B[Broker] --> C[Consumer]",
+                alt_text="Producer to consumer flow",
+            )
+        if schema is EvalResult:
+            return EvalResult(score=8, passed=True, feedback="")
+        if schema is SectionPatch:
+            return SectionPatch(edits=[])
+        raise ValueError(f"No canned output for {schema.__name__}")
+
+
+def fake_tavily(profile: Profile):
+    """Replacement for ``src.tools.search._tavily_search``."""
+
+    async def search(query: str) -> dict:
+        await asyncio.sleep(profile.search_latency)
+        return {
+            "results": [
+                {
+                    "title": f"{query} ({i})",
+                    "url": f"https://example.com/{zlib.crc32(query.encode()) % 10_000}/{i}",
+                    "content": f"Findings about {query}. " * 10,
+                }
+                for i in range(5)
+            ]
+        }
+
+    return search
+
+
+def fake_excalidraw_tools(profile: Profile) -> list[StructuredTool]:
+    """The three Excalidraw MCP tools the renderer calls, without a canvas."""
+
+    async def clear_canvas() -> str:
+        await asyncio.sleep(profile.tool_latency)
+        return "cleared"
+
+    async def create_from_mermaid(mermaidDiagram: str) -> str:
+        await asyncio.sleep(profile.tool_latency)
+        return "created"
+
+    async def export_to_image(format: str, filePath: str) -> str:
+        await asyncio.sleep(profile.tool_latency)
+        Path(filePath).write_bytes(b"\0" * (MIN_IMAGE_BYTES * 2))
+        return filePath
+
+    return [
+        StructuredTool.from_function(
+            coroutine=fn, name=fn.__name__, description=fn.__name__
+        )
+        for fn in (clear_canvas, create_from_mermaid, export_to_image)
+    ]
+
+
+class FakeExcalidrawRenderer:
+    """ExcalidrawRenderer's canvas protocol against in-process fake tools."""
+
+    name = "fake"
+    format = "png"
+
+    def __init__(self, profile: Profile):
+        self._tools = fake_excalidraw_tools(profile)
+
+    async def render(self, title: str, mermaid_code: str, image_path: Path) -> bool:
+        return await _render_on_canvas(self._tools, title, mermaid_code, image_path)
@@ -0,0 +1,179 @@
+"""Run the blog graph end to end against the fakes and report where time,
+memory and checkpoint bytes go.
+
+    python -m benchmarks.run --sizes 5 20 100 --mode staged pipeline
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import get_context
+
+# Tavily's client refuses to construct without a key; the fakes never use it.
+os.environ.setdefault("TAVILY_API_KEY", "offline")
+
+from benchmarks.fakes import FakeChatModel, FakeExcalidrawRenderer, Profile, fake_tavily
+from langgraph.types import Command
+from loguru import logger
+
+
+def install_fakes(profile: Profile, workdir: str):
+    """Point the LLM client factory, Tavily and the renderer table at the fakes and
+    turn off every cache, so each run does the full amount of work."""
+    import src.llm as llm
+    import src.tools.renderers as renderers
+    import src.tools.search as search
+    from src.config import config
+
+    config.LLM_CACHE_PATH = None
+    config.SEARCH_CACHE_PATH = None
+    config.DIAGRAM_CACHE_DIR = None
+    config.CHECKPOINT_PATH = os.path.join(workdir, "checkpoints.db")
+    config.CHECKPOINT_KEEP = 0
+    config.CHECKPOINT_VACUUM_INTERVAL = 0
+
+    fake = FakeChatModel(profile=profile, rng=random.Random(profile.seed))
+    llm._new_chat_model = lambda model, base_url: fake
+    search._tavily_search = fake_tavily(profile)
+    renderers.RENDERERS["fake"] = partial(FakeExcalidrawRenderer, profile)
+
+
+def _checkpoint_stats(path: str) -> dict:
+    conn = sqlite3.connect(path)
+    try:
+        checkpoints, checkpoint_bytes = conn.execute(
+            "SELECT count(*), coalesce(sum(length(checkpoint) + length(metadata)), 0) "
+            "FROM checkpoints"
+        ).fetchone()
+        (write_bytes,) = conn.execute(
+            "SELECT coalesce(sum(length(value)), 0) FROM writes"
+        ).fetchone()
+    finally:
+        conn.close()
+    return {
+        "checkpoints": checkpoints,
+        "checkpoint_bytes": checkpoint_bytes + write_bytes,
+    }
+
+
+async def run_once(profile: Profile, mode: str) -> dict:
+    from src.checkpoint import close_checkpointer
+    from src.graph import build_graph
+    from src.tracing import Tracer, activate
+
+    tracer = Tracer()
+    activate(tracer)
+    app = build_graph(mode)
+    config = {"configurable": {"thread_id": "benchmark"}, "callbacks": [tracer]}
+
+    start = time.perf_counter()
+    await app.ainvoke({"topic": "Benchmark topic", "diagram_renderer": "fake"}, config)
+    while (await app.aget_state(config)).next:
+        await app.ainvoke(Command(resume={"action": "approve"}), config)
+    wall = time.perf_counter() - start
+    await close_checkpointer()
+
+    nodes = defaultdict(lambda: {"calls": 0, "total": 0.0, "max": 0.0})
+    for span in tracer.spans:
+        if span.category == "node" and span.end is not None:
+            duration = span.end - span.start
+            stats = nodes[span.name]
+            stats["calls"] += 1
+            stats["total"] += duration
+            stats["max"] = max(stats["max"], duration)
+    return {"wall": wall, "nodes": dict(nodes)}
+
+
+def measure(profile_data: dict, mode: str) -> dict:
+    """One benchmark run, in a fresh process so peak RSS belongs to it alone."""
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    # One "unregistered type" warning per model class per checkpoint read.
+    logging.getLogger("langgraph.checkpoint.serde.jsonplus").setLevel(logging.ERROR)
+    profile = Profile(**profile_data)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        install_fakes(profile, workdir)
+        baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        result = asyncio.run(run_once(profile, mode))
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        result.update(_checkpoint_stats(os.path.join(workdir, "checkpoints.db")))
+
+    # ru_maxrss is in KiB on Linux
+    result.update(
+        mode=mode,
+        sections=profile.sections,
+        peak_rss_mb=peak / 1024,
+        run_rss_mb=(peak - baseline) / 1024,
+    )
+    return result
+
+
+def print_result(result: dict):
+    print(
+        f"\n{result['mode']}, {result['sections']} sections: "
+        f"{result['wall']:.2f}s wall, "
+        f"peak RSS {result['peak_rss_mb']:.1f} MB (+{result['run_rss_mb']:.1f} MB in run), "
+        f"{result['checkpoint_bytes'] / 1024:.1f} KB in {result['checkpoints']} checkpoints"
+    )
+    print(f"  {'node':<18} {'calls':>6} {'total s':>9} {'max s':>8}")
+    for name, stats in sorted(result["nodes"].items(), key=lambda kv: -kv[1]["total"]):
+        print(
+            f"  {name:<18} {stats['calls']:>6} {stats['total']:>9.2f} {stats['max']:>8.2f}"
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline benchmark of the blog graph.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 20, 100])
+    parser.add_argument(
+        "--mode", nargs="+", default=["staged"], choices=["staged", "pipeline"]
+    )
+    parser.add_argument("--llm-latency", type=float, default=Profile().llm_latency)
+    parser.add_argument("--llm-sigma", type=float, default=Profile().llm_sigma)
+    parser.add_argument("--output-tokens", type=int, default=Profile().output_tokens)
+    parser.add_argument("--search-latency", type=float, default=Profile().search_latency)
+    parser.add_argument("--tool-latency", type=float, default=Profile().tool_latency)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = []
+    for mode in args.mode:
+        for sections in args.sizes:
+            profile = Profile(
+                sections=sections,
+                llm_latency=args.llm_latency,
+                llm_sigma=args.llm_sigma,
+                output_tokens=args.output_tokens,
+                search_latency=args.search_latency,
+                tool_latency=args.tool_latency,
+                seed=args.seed,
+            )
+            with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+                result = pool.submit(measure, profile.model_dump(), mode).result()
+            print_result(result)
+            results.append(result)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class SQLiteCache:
+    """Key/value store in a local SQLite file, evicting least recently used
+    entries once the stored values exceed ``max_bytes``. With ``ttl`` set,
+    entries older than ``ttl`` seconds are treated as misses.
+
+    Lookups run on the event loop, so they only read: access times are
+    batched in memory and written with the next store, or once
+    ``ACCESS_BATCH`` hits have piled up.
+    """
+
+    ACCESS_BATCH = 256
+
+    def __init__(self, path: str, max_bytes: int, ttl: float | None = None):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # A lost tail of a cache after a power cut is a few misses; an fsync
+        # per commit is not worth it.
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)"
+        )
+        self._conn.commit()
+        self._accessed: dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> bytes | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            # An expired entry is replaced by the next store or evicted.
+            if row is None or (self._ttl and now - row[1] > self._ttl):
+                self.misses += 1
+                return None
+            self._accessed[key] = now
+            if len(self._accessed) >= self.ACCESS_BATCH:
+                self._flush_accessed()
+                self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: bytes) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now),
+            )
+            self._accessed.pop(key, None)
+            self._flush_accessed()
+            self._evict()
+            self._conn.commit()
+
+    def _flush_accessed(self) -> None:
+        if not self._accessed:
+            return
+        self._conn.executemany(
+            "UPDATE entries SET accessed = ? WHERE key = ?",
+            [(accessed, key) for key, accessed in self._accessed.items()],
+        )
+        self._accessed.clear()
+
+    def _evict(self) -> None:
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        if total <= self._max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed"
+        ).fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= self._max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._flush_accessed()
+            self._conn.commit()
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+        }
+
+
+class FileCache:
+    """Content-addressed directory of files, evicting least recently used
+    entries once their total size exceeds ``max_bytes``. Hits are hard-linked
+    into place (copied when the destination is on another filesystem)."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self._dir = Path(directory)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, dest: Path) -> bool:
+        """Materialize the entry for ``key`` at ``dest``; False on a miss."""
+        path = self._dir / key
+        with self._lock:
+            if not path.exists():
+                self.misses += 1
+                return False
+            os.utime(path)
+            self.hits += 1
+        dest.unlink(missing_ok=True)
+        try:
+            os.link(path, dest)
+        except OSError:
+            shutil.copyfile(path, dest)
+        return True
+
+    def put(self, key: str, src: Path) -> None:
+        path = self._dir / key
+        tmp = path.with_name(f".{path.name}.{threading.get_ident()}")
+        shutil.copyfile(src, tmp)
+        tmp.replace(path)
+        with self._lock:
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = [
+            (p.stat(), p) for p in self._dir.iterdir() if not p.name.startswith(".")
+        ]
+        total = sum(st.st_size for st, _ in entries)
+        for st, p in sorted(entries, key=lambda e: e[0].st_mtime):
+            if total <= self._max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= st.st_size
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,120 @@
+import asyncio
+import weakref
+
+import aiosqlite
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from loguru import logger
+from src.config import config
+
+# SQLite savers are bound to the event loop they were created on, so there is
+# one connection per loop (the CLI's asyncio.run, each Streamlit session's loop).
+_savers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, PruningSqliteSaver]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class PruningSqliteSaver(AsyncSqliteSaver):
+    """AsyncSqliteSaver that keeps only the latest ``keep`` checkpoints per
+    thread and namespace, and returns freed pages to the OS in the background.
+
+    Pending writes of the latest checkpoint are kept, so a crashed run resumes
+    without redoing the tasks that had already finished in that step.
+    """
+
+    def __init__(self, conn: aiosqlite.Connection, keep: int, vacuum_interval: float):
+        super().__init__(conn)
+        self.keep = keep
+        self.vacuum_interval = vacuum_interval
+        self._vacuum_task: asyncio.Task | None = None
+
+    async def setup(self) -> None:
+        if self.is_setup:
+            return
+        await super().setup()
+        async with self.lock:
+            async with self.conn.execute("PRAGMA auto_vacuum") as cur:
+                (mode,) = await cur.fetchone()
+            if mode != 2:
+                # Incremental auto-vacuum only takes effect after a full VACUUM.
+                await self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                await self.conn.execute("VACUUM")
+            if self._vacuum_task is None and self.vacuum_interval > 0:
+                self._vacuum_task = asyncio.get_running_loop().create_task(
+                    self._vacuum_periodically()
+                )
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        saved = await super().aput(config, checkpoint, metadata, new_versions)
+        if self.keep > 0:
+            await self._prune(
+                saved["configurable"]["thread_id"],
+                saved["configurable"]["checkpoint_ns"],
+            )
+        return saved
+
+    async def _prune(self, thread_id: str, checkpoint_ns: str):
+        scope = (str(thread_id), checkpoint_ns)
+        async with self.lock:
+            await self.conn.execute(
+                """DELETE FROM checkpoints
+                WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN (
+                    SELECT checkpoint_id FROM checkpoints
+                    WHERE thread_id = ? AND checkpoint_ns = ?
+                    ORDER BY checkpoint_id DESC LIMIT ?
+                )""",
+                (*scope, *scope, self.keep),
+            )
+            await self.conn.execute(
+                """DELETE FROM writes
+                WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN (
+                    SELECT checkpoint_id FROM checkpoints
+                    WHERE thread_id = ? AND checkpoint_ns = ?
+                )""",
+                (*scope, *scope),
+            )
+            await self.conn.commit()
+
+    async def _vacuum_periodically(self):
+        while True:
+            await asyncio.sleep(self.vacuum_interval)
+            try:
+                async with self.lock:
+                    async with self.conn.execute("PRAGMA incremental_vacuum") as cur:
+                        await cur.fetchall()
+                    async with self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)") as cur:
+                        await cur.fetchall()
+            except Exception as e:
+                logger.warning(f"Checkpoint vacuum failed: {e}")
+
+    async def aclose(self):
+        if self._vacuum_task is not None:
+            self._vacuum_task.cancel()
+        await self.conn.close()
+
+
+def get_checkpointer():
+    """Return the SQLite checkpointer for the running loop, or a fresh
+    InMemorySaver when CHECKPOINT_PATH is unset."""
+    if not config.CHECKPOINT_PATH:
+        return InMemorySaver()
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        raise RuntimeError(
+            "The SQLite checkpointer must be created inside a running event loop"
+        ) from None
+    if loop not in _savers:
+        _savers[loop] = PruningSqliteSaver(
+            aiosqlite.connect(config.CHECKPOINT_PATH),
+            keep=config.CHECKPOINT_KEEP,
+            vacuum_interval=config.CHECKPOINT_VACUUM_INTERVAL,
+        )
+    return _savers[loop]
+
+
+async def close_checkpointer():
+    """Close the running loop's SQLite connection, if one was opened."""
+    saver = _savers.pop(asyncio.get_running_loop(), None)
+    if saver is not None:
+        await saver.aclose()
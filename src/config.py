@@ -1,4 +1,5 @@
 from dotenv import load_dotenv
+import json
 import os
 
 load_dotenv()
@@ -8,9 +9,46 @@ class Config:
     BASE_URL = os.getenv("BASE_URL")
     API_KEY = os.getenv("API_KEY")
     MODEL_NAME = os.getenv("MODEL_NAME")
+    LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS") or 100)
+    LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY") or 30)
+    # Ceiling of the adaptive in-flight request limit (0 = LLM_MAX_CONNECTIONS)
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY") or 0)
+    # Provider quotas, requests and tokens per minute (0 = unlimited)
+    LLM_RPM = float(os.getenv("LLM_RPM") or 0)
+    LLM_TPM = float(os.getenv("LLM_TPM") or 0)
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES") or 4)
+    # Shrink concurrency when a call takes this many times its usual latency (0 = off)
+    RATE_LIMIT_LATENCY_SPIKE = float(os.getenv("RATE_LIMIT_LATENCY_SPIKE") or 3)
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH")
+    LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB") or 256)
+    # JSON price table, USD per million tokens:
+    # {"model": {"input": 0.15, "cached_input": 0.075, "output": 0.6}}
+    LLM_PRICES = json.loads(os.getenv("LLM_PRICES") or "{}")
+    GRAPH_MODE = os.getenv("GRAPH_MODE") or "staged"
+    CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH")
+    CHECKPOINT_KEEP = int(os.getenv("CHECKPOINT_KEEP") or 20)
+    CHECKPOINT_VACUUM_INTERVAL = float(os.getenv("CHECKPOINT_VACUUM_INTERVAL") or 600)
     TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
+    SEARCH_RPM = float(os.getenv("SEARCH_RPM") or 0)
+    SEARCH_MAX_CONCURRENCY = int(os.getenv("SEARCH_MAX_CONCURRENCY") or 16)
+    SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH")
+    SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL") or 86400)
+    SEARCH_CACHE_MAX_MB = int(os.getenv("SEARCH_CACHE_MAX_MB") or 64)
+    RESEARCH_MAX_ROUNDS = int(os.getenv("RESEARCH_MAX_ROUNDS") or 4)
+    RESEARCH_MAX_INPUT_TOKENS = int(os.getenv("RESEARCH_MAX_INPUT_TOKENS") or 60000)
+    RESEARCH_TIMEOUT = float(os.getenv("RESEARCH_TIMEOUT") or 120)
+    RESEARCH_SINGLE_CALL = os.getenv("RESEARCH_SINGLE_CALL", "").lower() in ("1", "true")
+    SPECULATIVE_RESEARCH = os.getenv("SPECULATIVE_RESEARCH", "").lower() in ("1", "true")
+    SPECULATIVE_RESEARCH_TTL = float(os.getenv("SPECULATIVE_RESEARCH_TTL") or 3600)
+    REWRITER_PATCH = os.getenv("REWRITER_PATCH", "").lower() in ("1", "true")
     EXCALIDRAW_PATH = os.getenv("EXCALIDRAW_PATH")
+    # Comma-separated: one MCP server process (and canvas) per URL
     EXCALIDRAW_SERVER_URL = os.getenv("EXCALIDRAW_SERVER_URL")
+    EXCALIDRAW_TIMEOUT = float(os.getenv("EXCALIDRAW_TIMEOUT") or 120)
+    DIAGRAM_RENDERER = os.getenv("DIAGRAM_RENDERER") or "excalidraw"
+    DIAGRAM_WORKERS = int(os.getenv("DIAGRAM_WORKERS") or 2)
+    DIAGRAM_CACHE_DIR = os.getenv("DIAGRAM_CACHE_DIR")
+    DIAGRAM_CACHE_MAX_MB = int(os.getenv("DIAGRAM_CACHE_MAX_MB") or 256)
 
 
 config = Config()
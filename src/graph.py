@@ -1,22 +1,36 @@
+from langchain_core.runnables import RunnableConfig
+from src.checkpoint import get_checkpointer
+from src.config import config
 from src.nodes.orchestrator import orchestrator
 from langgraph.graph import StateGraph, START, END
-from src.models import State
+from src.models import SectionOutput, SectionState, State
 from src.nodes.worker import worker
-from src.nodes.reducer import reducer
-from src.nodes.fanout import fanout_to_researchers, fanout_to_writers
+from src.nodes.reducer import images_dir, reducer
+from src.nodes.fanout import (
+    fanout_to_researchers,
+    fanout_to_rewriters,
+    fanout_to_sections,
+    fanout_to_writers,
+)
 from src.nodes.researcher import researcher
+from src.nodes.search_planner import search_planner
 from src.nodes.reviewer import plan_review
-from src.nodes.image_generator import image_generator
+from src.nodes.image_generator import generate_images, image_generator
 from src.nodes.topic_guard import topic_guard
 from src.nodes.evaluator import evaluator
 from src.nodes.rewriter import rewriter
-from langgraph.checkpoint.memory import InMemorySaver
+from src.speculation import get_speculative_research
 from langgraph.types import Send
 
+GRAPH_MODES = ("staged", "pipeline")
 
-def pre_research(state: State) -> dict:
-    """Bridge node: plan approved, fan out to researchers from here."""
-    return {}
+
+async def pre_research(state: State, config: RunnableConfig) -> dict:
+    """Bridge node: plan approved, fan out to researchers from here. Research
+    done speculatively during the review is committed first."""
+    return await get_speculative_research().collect(
+        config["configurable"]["thread_id"], state["plan"]
+    )
 
 
 def research_done(state: State) -> dict:
@@ -30,32 +44,86 @@ def route_after_guard(state: State) -> str:
     return "orchestrator"
 
 
-def route_after_pre_research(state: State) -> list[Send] | str:
+def route_to_researchers(state: State) -> list[Send] | str:
     sends = fanout_to_researchers(state)
     if sends:
         return sends
     return "research_done"
 
 
-def route_after_eval(state: State) -> str:
-    if not state.get("eval_feedback"):
-        return END
-    if state.get("eval_count", 0) >= 2:
+def route_section_start(state: SectionState) -> str:
+    if state["task"].needs_research and not state.get("research"):
+        return "researcher"
+    return "worker"
+
+
+def route_section_end(state: SectionState) -> str:
+    return "image_generator" if state["task"].needs_image else END
+
+
+async def section_worker(state: SectionState) -> dict:
+    research = state.get("research")
+    return await worker({**state, "research": research[0] if research else None})
+
+
+async def section_images(state: SectionState, config: RunnableConfig) -> dict:
+    return await generate_images(
+        [state["task"]],
+        state["sections"],
+        state.get("diagram_renderer"),
+        state["blog_context"],
+        images_dir(config["configurable"]["thread_id"]),
+    )
+
+
+def build_section_graph():
+    """One task's research -> write -> diagram chain, sent per task in
+    pipeline mode so sections only meet again at the reducer."""
+    graph = StateGraph(SectionState, output_schema=SectionOutput)
+
+    graph.add_node("researcher", researcher)
+    graph.add_node("worker", section_worker)
+    graph.add_node("image_generator", section_images)
+
+    graph.add_conditional_edges(START, route_section_start, ["researcher", "worker"])
+    graph.add_edge("researcher", "worker")
+    graph.add_conditional_edges(
+        "worker", route_section_end, ["image_generator", END]
+    )
+    graph.add_edge("image_generator", END)
+
+    return graph.compile()
+
+
+def route_after_eval(state: State) -> list[Send] | str:
+    """Send each failing section of a failing post to its own rewriter; the
+    reducer then reassembles the post for another evaluation."""
+    if not state.get("eval_feedback") or state.get("eval_count", 0) >= 2:
         return END
-    return "rewriter"
+    return fanout_to_rewriters(state) or END
+
 
+def build_graph(mode: str | None = None):
+    """Assemble the blog graph.
+
+    ``staged`` (default) plans the blog's searches up front, then runs
+    research, writing and diagrams as separate fan-out stages. ``pipeline``
+    sends each task through its own section subgraph straight from the
+    approved plan, so a slow section only delays itself until the reducer.
+
+    With CHECKPOINT_PATH set, checkpoints go to SQLite and the graph must be
+    built inside the event loop it will run on.
+    """
+    mode = mode or config.GRAPH_MODE
+    if mode not in GRAPH_MODES:
+        raise ValueError(f"Unknown graph mode '{mode}', expected one of {GRAPH_MODES}")
 
-def build_graph():
     graph = StateGraph(State)
 
     graph.add_node("topic_guard", topic_guard)
     graph.add_node("orchestrator", orchestrator)
     graph.add_node("plan_review", plan_review)
     graph.add_node("pre_research", pre_research)
-    graph.add_node("researcher", researcher)
-    graph.add_node("research_done", research_done)
-    graph.add_node("worker", worker)
-    graph.add_node("image_generator", image_generator)
     graph.add_node("reducer", reducer)
     graph.add_node("evaluator", evaluator)
     graph.add_node("rewriter", rewriter)
@@ -65,18 +133,34 @@ def build_graph():
         "topic_guard", route_after_guard, ["orchestrator", END]
     )
     graph.add_edge("orchestrator", "plan_review")
-    graph.add_conditional_edges(
-        "pre_research", route_after_pre_research, ["researcher", "research_done"]
-    )
-    graph.add_edge("researcher", "research_done")
-    graph.add_conditional_edges("research_done", fanout_to_writers, ["worker"])
-    graph.add_edge("worker", "image_generator")
-    graph.add_edge("image_generator", "reducer")
+
+    if mode == "pipeline":
+        # No blog-wide search plan: it would hold every section until the
+        # slowest planned query returns. Each researcher searches on its own.
+        graph.add_node("section_pipeline", build_section_graph())
+        graph.add_conditional_edges(
+            "pre_research", fanout_to_sections, ["section_pipeline"]
+        )
+        graph.add_edge("section_pipeline", "reducer")
+    else:
+        graph.add_node("search_planner", search_planner)
+        graph.add_node("researcher", researcher)
+        graph.add_node("research_done", research_done)
+        graph.add_node("worker", worker)
+        graph.add_node("image_generator", image_generator)
+        graph.add_edge("pre_research", "search_planner")
+        graph.add_conditional_edges(
+            "search_planner", route_to_researchers, ["researcher", "research_done"]
+        )
+        graph.add_edge("researcher", "research_done")
+        graph.add_conditional_edges("research_done", fanout_to_writers, ["worker"])
+        graph.add_edge("worker", "image_generator")
+        graph.add_edge("image_generator", "reducer")
+
     graph.add_edge("reducer", "evaluator")
     graph.add_conditional_edges(
         "evaluator", route_after_eval, ["rewriter", END]
     )
-    graph.add_edge("rewriter", "evaluator")
+    graph.add_edge("rewriter", "reducer")
 
-    checkpointer = InMemorySaver()
-    return graph.compile(checkpointer=checkpointer)
+    return graph.compile(checkpointer=get_checkpointer())
@@ -1,49 +1,350 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import httpx
+import openai
+from src.cache import SQLiteCache
 from src.config import config
+from langchain_core.messages import message_to_dict, messages_from_dict
 from langchain_openai import ChatOpenAI
 from typing import Any
 from src.models import TokenUsage
+from src.ratelimit import AdaptiveLimiter, Outcome
+from src.tracing import annotate, traced
+
+
+
+class _Registry:
+    """One pooled ChatOpenAI per (model, base_url), plus the runnables derived
+    from it (structured output, bound tools)."""
+
+    def __init__(self):
+        self.clients: dict[tuple[str, str], ChatOpenAI] = {}
+        self.runnables: dict[tuple, Any] = {}
+
+
+# httpx async pools are bound to the loop that first uses them, so each event
+# loop (CLI, Streamlit sessions, background loop threads) gets its own
+# registry; synchronous callers share one.
+_registries: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _Registry]" = (
+    weakref.WeakKeyDictionary()
+)
+_sync_registry = _Registry()
+_lock = threading.Lock()
+# Extra ledger that calls made in this context are also counted in.
+_usage_sink: ContextVar[TokenUsage | None] = ContextVar("usage_sink", default=None)
+_response_cache: SQLiteCache | None = None
+_limiter: AdaptiveLimiter | None = None
+
+# Reserved against LLM_TPM per call on top of the prompt, until the response
+# reports the real count.
+EXPECTED_OUTPUT_TOKENS = 512
+
+
+def _registry() -> _Registry:
+    """The running loop's registry, or the shared one outside a loop.
+    Call with ``_lock`` held."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return _sync_registry
+    if loop not in _registries:
+        _registries[loop] = _Registry()
+    return _registries[loop]
+
+
+def _new_chat_model(model: str, base_url: str) -> ChatOpenAI:
+    limits = httpx.Limits(
+        max_connections=config.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=config.LLM_MAX_CONNECTIONS,
+        keepalive_expiry=config.LLM_KEEPALIVE_EXPIRY,
+    )
+    return ChatOpenAI(
+        model=model,
+        base_url=base_url,
+        api_key=config.API_KEY,
+        stream_usage=True,
+        # Retries go through the shared limiter, so they back off together.
+        max_retries=0,
+        http_client=httpx.Client(limits=limits),
+        http_async_client=httpx.AsyncClient(limits=limits),
+    )
+
+
+def get_chat_model(model: str | None = None, base_url: str | None = None) -> ChatOpenAI:
+    """Return the ChatOpenAI for (model, base_url) on the running loop,
+    creating it on first use."""
+    key = (model or config.MODEL_NAME, base_url or config.BASE_URL)
+    with _lock:
+        clients = _registry().clients
+        if key not in clients:
+            clients[key] = _new_chat_model(*key)
+        return clients[key]
+
+
+def get_response_cache() -> SQLiteCache | None:
+    """Return the on-disk response cache, or None when LLM_CACHE_PATH is unset."""
+    global _response_cache
+    if config.LLM_CACHE_PATH and _response_cache is None:
+        with _lock:
+            if _response_cache is None:
+                _response_cache = SQLiteCache(
+                    config.LLM_CACHE_PATH, config.LLM_CACHE_MAX_MB * 1024 * 1024
+                )
+    return _response_cache
+
+
+def _classify(error: BaseException) -> Outcome:
+    if isinstance(error, openai.RateLimitError):
+        return "throttled"
+    if isinstance(error, (openai.APIConnectionError, openai.InternalServerError)):
+        return "transient"
+    return None
+
+
+def get_llm_limiter() -> AdaptiveLimiter:
+    """Return the process-wide limiter every LLM request is admitted through."""
+    global _limiter
+    with _lock:
+        if _limiter is None:
+            _limiter = AdaptiveLimiter(
+                "LLM",
+                max_concurrency=config.LLM_MAX_CONCURRENCY or config.LLM_MAX_CONNECTIONS,
+                rpm=config.LLM_RPM,
+                tpm=config.LLM_TPM,
+                classify=_classify,
+                max_retries=config.LLM_MAX_RETRIES,
+                latency_spike=config.RATE_LIMIT_LATENCY_SPIKE,
+            )
+        return _limiter
+
+
+def _estimate_tokens(messages) -> int:
+    chars = sum(len(str(getattr(m, "content", m))) for m in messages)
+    return chars // 4 + EXPECTED_OUTPUT_TOKENS
+
+
+def _total_tokens(message) -> int | None:
+    return (message.usage_metadata or {}).get("total_tokens")
+
+
+def _cost(model: str, input_tokens: int, output_tokens: int, cache_read: int) -> float:
+    prices = config.LLM_PRICES.get(model)
+    if not prices:
+        return 0.0
+    input_price = prices.get("input", 0)
+    return (
+        (input_tokens - cache_read) * input_price
+        + cache_read * prices.get("cached_input", input_price)
+        + output_tokens * prices.get("output", 0)
+    ) / 1_000_000
+
+
+@contextmanager
+def recording_usage(usage: TokenUsage):
+    """Also count every LLM call made inside the block in ``usage``, so work
+    that is cancelled before its node returns is still accounted for."""
+    token = _usage_sink.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage_sink.reset(token)
+
+
+def _add_usage(target: TokenUsage, delta: TokenUsage):
+    for name in TokenUsage.model_fields:
+        setattr(target, name, getattr(target, name) + getattr(delta, name))
+
+
+def _memoized(key: tuple, factory):
+    with _lock:
+        runnables = _registry().runnables
+        if key not in runnables:
+            runnables[key] = factory()
+        return runnables[key]
 
 
 class LLM:
     def __init__(self, node_name: str = "unknown"):
-        self._llm = ChatOpenAI(
-            model=config.MODEL_NAME,
-            base_url=config.BASE_URL,
-            api_key=config.API_KEY,
-        )
+        self._llm = get_chat_model()
+        self._model = self._llm.model_name
+        self._tool_names: tuple[str, ...] = ()
         self._node_name = node_name
-        self._usage: list[TokenUsage] = []
+        self._usage = TokenUsage()
 
+    @traced("llm", "llm")
     def invoke(self, messages):
-        response = self._llm.invoke(messages)
-        self._track(response.usage_metadata)
+        key, cached = self._lookup(messages)
+        if cached:
+            return self._replay(cached)
+        start = time.perf_counter()
+        response, queued = get_llm_limiter().call_blocking(
+            lambda: self._llm.invoke(messages),
+            tokens=_estimate_tokens(messages),
+            key=self._node_name,
+            used_tokens=_total_tokens,
+        )
+        self._track(response.usage_metadata, time.perf_counter() - start, queued)
+        self._store(key, {"message": message_to_dict(response)})
         return response
 
+    @traced("llm", "llm")
+    async def ainvoke(self, messages, metadata: dict | None = None):
+        """``metadata`` is attached to the model run, so it shows up next to
+        each token when the graph is streamed with stream_mode="messages"."""
+        key, cached = self._lookup(messages)
+        if cached:
+            return self._replay(cached)
+        start = time.perf_counter()
+        response, queued = await get_llm_limiter().call(
+            lambda: self._llm.ainvoke(
+                messages, config={"metadata": metadata} if metadata else None
+            ),
+            tokens=_estimate_tokens(messages),
+            key=self._node_name,
+            used_tokens=_total_tokens,
+        )
+        self._track(response.usage_metadata, time.perf_counter() - start, queued)
+        self._store(key, {"message": message_to_dict(response)})
+        return response
+
+    @traced("llm", "llm")
     def invoke_structured(self, messages, schema):
-        response = self._llm.with_structured_output(schema, include_raw=True).invoke(
-            messages
+        key, cached = self._lookup(messages, schema)
+        if cached:
+            return self._replay_structured(cached, schema)
+        start = time.perf_counter()
+        response, queued = get_llm_limiter().call_blocking(
+            lambda: self._structured(schema).invoke(messages),
+            tokens=_estimate_tokens(messages),
+            key=self._node_name,
+            used_tokens=lambda r: _total_tokens(r["raw"]),
+        )
+        elapsed = time.perf_counter() - start
+        self._track(response["raw"].usage_metadata, elapsed, queued)
+        self._store_structured(key, response)
+        return response["parsed"]
+
+    @traced("llm", "llm")
+    async def ainvoke_structured(self, messages, schema):
+        key, cached = self._lookup(messages, schema)
+        if cached:
+            return self._replay_structured(cached, schema)
+        start = time.perf_counter()
+        response, queued = await get_llm_limiter().call(
+            lambda: self._structured(schema).ainvoke(messages),
+            tokens=_estimate_tokens(messages),
+            key=self._node_name,
+            used_tokens=lambda r: _total_tokens(r["raw"]),
         )
-        self._track(response["raw"].usage_metadata)
+        elapsed = time.perf_counter() - start
+        self._track(response["raw"].usage_metadata, elapsed, queued)
+        self._store_structured(key, response)
         return response["parsed"]
 
-    def with_tools(self, tools):
+    def with_tools(self, tools, tool_choice: str | None = None):
+        names = tuple(getattr(t, "name", None) or t.__name__ for t in tools)
         clone = LLM.__new__(LLM)
-        clone._llm = self._llm.bind_tools(tools)
+        clone._llm = _memoized(
+            (id(self._llm), "tools", names, tool_choice),
+            lambda: self._llm.bind_tools(tools, tool_choice=tool_choice),
+        )
+        clone._model = self._model
+        clone._tool_names = names
         clone._node_name = self._node_name
         clone._usage = self._usage
         return clone
 
-    def _track(self, metadata):
+    def _structured(self, schema):
+        return _memoized(
+            (id(self._llm), "structured", schema),
+            lambda: self._llm.with_structured_output(schema, include_raw=True),
+        )
+
+    def _lookup(self, messages, schema=None) -> tuple[str | None, dict | None]:
+        cache = get_response_cache()
+        if cache is None:
+            return None, None
+        payload = json.dumps(
+            {
+                "model": self._model,
+                "tools": self._tool_names,
+                "schema": schema.model_json_schema() if schema else None,
+                "messages": [message_to_dict(m) for m in messages],
+            },
+            sort_keys=True,
+        )
+        key = hashlib.sha256(payload.encode()).hexdigest()
+        cached = cache.get(key)
+        return key, json.loads(cached) if cached else None
+
+    def _store(self, key: str | None, entry: dict):
+        if key is not None:
+            get_response_cache().set(key, json.dumps(entry).encode())
+
+    def _store_structured(self, key: str | None, response: dict):
+        if response["parsed"] is None:
+            return
+        self._store(
+            key,
+            {
+                "parsed": response["parsed"].model_dump(),
+                "usage": response["raw"].usage_metadata,
+            },
+        )
+
+    def _replay(self, cached: dict):
+        response = messages_from_dict([cached["message"]])[0]
+        self._track_cached(response.usage_metadata)
+        return response
+
+    def _replay_structured(self, cached: dict, schema):
+        self._track_cached(cached["usage"])
+        return schema.model_validate(cached["parsed"])
+
+    def _record(self, delta: TokenUsage):
+        _add_usage(self._usage, delta)
+        sink = _usage_sink.get()
+        if sink is not None:
+            _add_usage(sink, delta)
+
+    def _track(self, metadata, elapsed: float, queued: float):
+        delta = TokenUsage(calls=1, latency=elapsed - queued, queue_wait=queued)
+        annotate(queue_wait=queued)
         if metadata:
-            self._usage.append(
-                TokenUsage(
-                    node=self._node_name,
-                    input_tokens=metadata.get("input_tokens", 0),
-                    output_tokens=metadata.get("output_tokens", 0),
-                    total_tokens=metadata.get("total_tokens", 0),
-                )
+            delta.input_tokens = metadata.get("input_tokens", 0)
+            delta.output_tokens = metadata.get("output_tokens", 0)
+            delta.cache_read_tokens = (metadata.get("input_token_details") or {}).get(
+                "cache_read", 0
+            )
+            delta.cost = _cost(
+                self._model,
+                delta.input_tokens,
+                delta.output_tokens,
+                delta.cache_read_tokens,
             )
+            annotate(
+                model=self._model,
+                input_tokens=delta.input_tokens,
+                output_tokens=delta.output_tokens,
+                cache_read_tokens=delta.cache_read_tokens,
+            )
+        self._record(delta)
+
+    def _track_cached(self, metadata):
+        delta = TokenUsage(cached_calls=1)
+        if metadata:
+            delta.cached_tokens = metadata.get("total_tokens", 0)
+        annotate(cached=True)
+        self._record(delta)
 
     @property
-    def usage(self) -> list[TokenUsage]:
-        return self._usage
+    def usage(self) -> dict[str, TokenUsage]:
+        """This node's usage, in the shape of State["token_usage"]."""
+        return {self._node_name: self._usage.model_copy()}
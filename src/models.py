@@ -1,13 +1,54 @@
 from pydantic import BaseModel, Field
 from typing import TypedDict, List, Annotated
-import operator
 
 
 class TokenUsage(BaseModel):
-    node: str
-    input_tokens: int
-    output_tokens: int
-    total_tokens: int
+    """Aggregated model usage of one node. Calls served from the response
+    cache only count towards ``cached_calls`` and ``cached_tokens``."""
+
+    calls: int = 0
+    cached_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+    cache_read_tokens: int = Field(
+        default=0, description="Input tokens served from the provider's prompt cache"
+    )
+    latency: float = Field(default=0.0, description="Seconds spent waiting on the model")
+    queue_wait: float = Field(
+        default=0.0, description="Seconds spent queued in the rate limiter"
+    )
+    cost: float = Field(default=0.0, description="Estimated USD, from LLM_PRICES")
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        return self.cache_read_tokens / self.input_tokens if self.input_tokens else 0.0
+
+    def __add__(self, other: "TokenUsage") -> "TokenUsage":
+        return TokenUsage(
+            **{
+                name: getattr(self, name) + getattr(other, name)
+                for name in TokenUsage.model_fields
+            }
+        )
+
+
+def merge_usage(
+    existing: dict[str, TokenUsage], new: dict[str, TokenUsage]
+) -> dict[str, TokenUsage]:
+    """Reducer summing usage per node, so state stays one entry per node."""
+    merged = dict(existing)
+    for node, usage in new.items():
+        merged[node] = merged[node] + usage if node in merged else usage
+    return merged
+
+
+def total_usage(usage: dict[str, TokenUsage]) -> TokenUsage:
+    return sum(usage.values(), TokenUsage())
 
 
 class Task(BaseModel):
@@ -33,17 +74,50 @@ class ResearchResult(BaseModel):
     key_findings: list[str]
 
 
+class SectionQueries(BaseModel):
+    section_title: str
+    queries: list[str] = Field(description="2-3 focused web search queries")
+
+
+class SearchPlan(BaseModel):
+    sections: list[SectionQueries]
+
+
 class TopicCheck(BaseModel):
     is_technical: bool
     reason: str = Field(description="One-sentence explanation if rejected")
 
 
+class SectionEval(BaseModel):
+    section_title: str = Field(description="Exact title of the section")
+    score: int = Field(description="Quality score 1-10")
+    passed: bool = Field(description="True if score >= 7")
+    feedback: str = Field(
+        description="Specific improvement suggestions if not passed, empty string if passed"
+    )
+
+
 class EvalResult(BaseModel):
     score: int = Field(description="Quality score 1-10")
     passed: bool = Field(description="True if score >= 7")
     feedback: str = Field(
         description="Specific improvement suggestions if not passed, empty string if passed"
     )
+    sections: List[SectionEval] = Field(
+        default_factory=list, description="One evaluation per section"
+    )
+
+
+class SectionEdit(BaseModel):
+    find: str = Field(
+        description="Exact text to replace, copied verbatim from the section "
+        "(a sentence or a whole paragraph); must occur exactly once"
+    )
+    replace: str = Field(description="Replacement markdown")
+
+
+class SectionPatch(BaseModel):
+    edits: List[SectionEdit] = Field(description="Edits to apply, in order")
 
 
 class DiagramSpec(BaseModel):
@@ -62,15 +136,54 @@ class Section(BaseModel):
     content: str
 
 
+def _merge_by(key: str):
+    """Reducer that merges lists keyed on ``key``: a retried or rewritten
+    item replaces the earlier one instead of piling up next to it."""
+
+    def merge(existing: list, new: list) -> list:
+        merged = {getattr(item, key): item for item in existing}
+        merged.update((getattr(item, key), item) for item in new)
+        return list(merged.values())
+
+    return merge
+
+
+merge_research = _merge_by("section_title")
+merge_sections = _merge_by("title")
+merge_images = _merge_by("section_title")
+
+
 class State(TypedDict):
     topic: str
+    diagram_renderer: str
     topic_error: str
     plan: Plan
     feedback: str
-    research: Annotated[List[ResearchResult], operator.add]
-    sections: Annotated[List[Section], operator.add]
+    search_results: dict[str, str]
+    research: Annotated[List[ResearchResult], merge_research]
+    sections: Annotated[List[Section], merge_sections]
     final: str
     eval_feedback: str
+    section_feedback: dict[str, str]
     eval_count: int
-    token_usage: Annotated[List[TokenUsage], operator.add]
-    images: Annotated[List[ImageResult], operator.add]
+    token_usage: Annotated[dict[str, TokenUsage], merge_usage]
+    images: Annotated[List[ImageResult], merge_images]
+
+
+class SectionState(TypedDict):
+    """State of one task's research -> write -> diagram chain (pipeline mode)."""
+
+    blog_context: str
+    task: Task
+    diagram_renderer: str
+    research: Annotated[List[ResearchResult], merge_research]
+    sections: Annotated[List[Section], merge_sections]
+    token_usage: Annotated[dict[str, TokenUsage], merge_usage]
+    images: Annotated[List[ImageResult], merge_images]
+
+
+class SectionOutput(TypedDict):
+    research: List[ResearchResult]
+    sections: List[Section]
+    token_usage: dict[str, TokenUsage]
+    images: List[ImageResult]
@@ -1,12 +1,14 @@
 from src.llm import LLM
 from src.models import EvalResult, State
+from src.prompts import blog_context
 from langchain_core.messages import SystemMessage, HumanMessage
 
 
-def evaluator(state: State) -> dict:
+async def evaluator(state: State) -> dict:
     llm = LLM(node_name="evaluator")
+    titles = [task.title for task in state["plan"].tasks]
 
-    result = llm.invoke_structured(
+    result = await llm.ainvoke_structured(
         [
             SystemMessage(
                 content="""You are a senior technical editor. Evaluate this blog post
@@ -20,15 +22,28 @@ def evaluator(state: State) -> dict:
                 Score 7+ means publish-ready. Below 7, provide 2-3 specific,
                 actionable improvements (not vague advice like "add more detail").
 
+                Then score every "##" section on its own with the same criteria,
+                using its exact title. Only failing sections get rewritten, so put
+                each improvement on the section it applies to.
+
                 If passed, feedback MUST be an empty string."""
             ),
+            HumanMessage(content=blog_context(state["plan"], state["topic"])),
             HumanMessage(content=f"Evaluate this blog post:\n\n{state['final']}"),
         ],
         EvalResult,
     )
 
+    # A passing post is left alone, whatever its weakest section scored.
+    section_feedback = {
+        s.section_title: s.feedback
+        for s in result.sections
+        if not result.passed and not s.passed and s.section_title in titles
+    }
+
     return {
         "eval_feedback": result.feedback if not result.passed else "",
+        "section_feedback": section_feedback,
         "eval_count": state.get("eval_count", 0) + 1,
         "token_usage": llm.usage,
     }
@@ -1,18 +1,24 @@
 from langgraph.types import Send
 from src.models import State
+from src.prompts import blog_context
 from typing import List
 
 
 def fanout_to_researchers(state: State) -> List[Send]:
     tasks = state["plan"].tasks
+    context = blog_context(state["plan"], state["topic"])
+    researched = {r.section_title for r in state.get("research", [])}
     send_objs = []
     for task in tasks:
-        if task.needs_research:
+        if task.needs_research and task.title not in researched:
             obj = Send(
                 node="researcher",
                 arg={
-                    "topic": state["topic"],
+                    "blog_context": context,
                     "task": task,
+                    "search_results": state.get("search_results", {}).get(
+                        task.title, ""
+                    ),
                 },
             )
             send_objs.append(obj)
@@ -22,16 +28,56 @@ def fanout_to_researchers(state: State) -> List[Send]:
 def fanout_to_writers(state: State) -> List[Send]:
     research_map = {r.section_title: r for r in state["research"]}
     tasks = state["plan"].tasks
+    context = blog_context(state["plan"], state["topic"])
     send_objs = []
     for task in tasks:
         obj = Send(
             node="worker",
             arg={
-                "plan": state["plan"],
-                "topic": state["topic"],
+                "blog_context": context,
                 "task": task,
                 "research": research_map.get(task.title),
             },
         )
         send_objs.append(obj)
     return send_objs
+
+
+def fanout_to_sections(state: State) -> List[Send]:
+    context = blog_context(state["plan"], state["topic"])
+    research_map = {r.section_title: r for r in state.get("research", [])}
+    return [
+        Send(
+            node="section_pipeline",
+            arg={
+                "blog_context": context,
+                "task": task,
+                "diagram_renderer": state.get("diagram_renderer", ""),
+                "research": (
+                    [research_map[task.title]] if task.title in research_map else []
+                ),
+            },
+        )
+        for task in state["plan"].tasks
+    ]
+
+
+def fanout_to_rewriters(state: State) -> List[Send]:
+    section_map = {s.title: s for s in state["sections"]}
+    context = blog_context(state["plan"], state["topic"])
+    # Without usable per-section verdicts, every section gets the overall feedback.
+    section_feedback = state.get("section_feedback") or {
+        title: state["eval_feedback"] for title in section_map
+    }
+    return [
+        Send(
+            node="rewriter",
+            arg={
+                "blog_context": context,
+                "section": section_map[title],
+                "feedback": feedback,
+            },
+        )
+        for title, feedback in section_feedback.items()
+        if title in section_map
+    ]
@@ -1,16 +1,35 @@
+import asyncio
+import hashlib
 import re
 from pathlib import Path
 
+from langchain_core.runnables import RunnableConfig
+from src.cache import FileCache
+from src.config import config
 from src.llm import LLM
-from src.models import DiagramSpec, ImageResult, State
-from src.tools.image import get_excalidraw_tools, get_tool_by_name
+from src.models import DiagramSpec, ImageResult, Section, State, Task
+from src.nodes.reducer import images_dir
+from src.prompts import blog_context
+from src.tools.renderers import Renderer, get_renderer
 from langchain_core.messages import SystemMessage, HumanMessage
 from loguru import logger
 
-MIN_IMAGE_BYTES = 5_000
 _FENCE_RE = re.compile(r"^```(?:mermaid)?\s*\n?", re.MULTILINE)
 _FENCE_END_RE = re.compile(r"\n?```\s*$", re.MULTILINE)
 
+_diagram_cache: FileCache | None = None
+
+
+def get_diagram_cache() -> FileCache | None:
+    """Return the rendered-diagram cache, or None when DIAGRAM_CACHE_DIR is unset."""
+    global _diagram_cache
+    if config.DIAGRAM_CACHE_DIR and _diagram_cache is None:
+        _diagram_cache = FileCache(
+            config.DIAGRAM_CACHE_DIR,
+            config.DIAGRAM_CACHE_MAX_MB * 1024 * 1024,
+        )
+    return _diagram_cache
+
 
 def _clean_mermaid(raw: str) -> str:
     code = _FENCE_RE.sub("", raw)
@@ -18,10 +37,109 @@ def _clean_mermaid(raw: str) -> str:
     return code.strip()
 
 
-async def image_generator(state: State) -> dict:
+async def _diagram_spec(llm: LLM, context: str, task, section_content: str):
+    spec = await llm.ainvoke_structured(
+        [
+            SystemMessage(
+                content="""You are a technical diagram expert. Given a blog section,
+                create a Mermaid diagram that visualizes the key concept.
+
+                Rules:
+                - Use flowchart (graph TD/LR), sequence diagram, or class diagram
+                - Keep it simple: 5-10 nodes max
+                - Use clear, short labels (2-4 words per node)
+                - Output ONLY valid Mermaid syntax — no markdown fences
+                - Prefer flowchart for workflows/architectures,
+                  sequence for request/response interactions,
+                  class diagram for data structures
+                - alt_text: a brief caption (5-8 words), NOT a paragraph"""
+            ),
+            HumanMessage(content=context),
+            HumanMessage(
+                content=f"Create a Mermaid diagram for this blog section:\n\n"
+                f"Title: {task.title}\nBrief: {task.brief}\n\n"
+                f"Content:\n{section_content[:1000]}"
+            ),
+        ],
+        DiagramSpec,
+    )
+    return task, spec
+
+
+def _cached_diagram(cache: FileCache | None, key: str, image_path: Path) -> bool:
+    """Copy a cached diagram to ``image_path``; any cache error is a miss."""
+    if cache is None:
+        return False
+    try:
+        return cache.get(key, image_path)
+    except OSError as e:
+        # e.g. the entry was evicted between the lookup and the copy
+        logger.warning(f"Diagram cache read failed for {key}: {e}")
+        return False
+
+
+def _cache_diagram(cache: FileCache | None, key: str, image_path: Path):
+    if cache is None:
+        return
+    try:
+        cache.put(key, image_path)
+    except OSError as e:
+        logger.warning(f"Diagram cache write failed for {key}: {e}")
+
+
+async def _render_on(
+    renderer: Renderer, task, spec: DiagramSpec, output_dir: Path
+) -> ImageResult | None:
+    mermaid_code = _clean_mermaid(spec.mermaid_code)
+    slug = re.sub(r"[^a-z0-9]+", "_", task.title.lower()).strip("_")
+    filename = f"{slug}.{renderer.format}"
+    image_path = (output_dir / filename).resolve()
+
+    cache = get_diagram_cache()
+    digest = hashlib.sha256(f"{renderer.format}\n{mermaid_code}".encode()).hexdigest()
+    key = f"{digest}.{renderer.format}"
+
+    if _cached_diagram(cache, key, image_path):
+        logger.info(f"Reused cached diagram: {image_path}")
+    else:
+        # Drop any hard link left by an earlier cache hit so the export
+        # cannot write through into a cached file.
+        image_path.unlink(missing_ok=True)
+        try:
+            rendered = await renderer.render(task.title, mermaid_code, image_path)
+        except Exception as e:
+            logger.warning(f"Diagram render failed for '{task.title}': {e}, skipping.")
+            return None
+        if not rendered:
+            return None
+        _cache_diagram(cache, key, image_path)
+        logger.info(f"Saved diagram: {image_path}")
+
+    return ImageResult(
+        section_title=task.title,
+        image_path=str(image_path),
+        alt_text=spec.alt_text,
+    )
+
 
-    tasks = state["plan"].tasks
-    section_map = {s.title: s.content for s in state["sections"]}
+async def image_generator(state: State, config: RunnableConfig) -> dict:
+    return await generate_images(
+        state["plan"].tasks,
+        state["sections"],
+        state.get("diagram_renderer"),
+        blog_context(state["plan"], state["topic"]),
+        images_dir(config["configurable"]["thread_id"]),
+    )
+
+
+async def generate_images(
+    tasks: list[Task],
+    sections: list[Section],
+    renderer_name: str | None,
+    context: str,
+    output_dir: Path,
+) -> dict:
+    section_map = {s.title: s.content for s in sections}
 
     image_tasks = [
         (task, section_map[task.title])
@@ -34,77 +152,26 @@ async def image_generator(state: State) -> dict:
         return {"images": []}
 
     llm = LLM(node_name="image_generator")
-    tools = await get_excalidraw_tools()
-    clear = get_tool_by_name(tools, "clear_canvas")
-    create = get_tool_by_name(tools, "create_from_mermaid")
-    export = get_tool_by_name(tools, "export_to_image")
+    renderer = get_renderer(renderer_name)
 
-    output_dir = Path("output/images")
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    images = []
-
-    for task, section_content in image_tasks:
-        logger.info(f"Generating diagram for: {task.title}")
-
-        spec = llm.invoke_structured(
-            [
-                SystemMessage(
-                    content="""You are a technical diagram expert. Given a blog section,
-                    create a Mermaid diagram that visualizes the key concept.
-
-                    Rules:
-                    - Use flowchart (graph TD/LR), sequence diagram, or class diagram
-                    - Keep it simple: 5-10 nodes max
-                    - Use clear, short labels (2-4 words per node)
-                    - Output ONLY valid Mermaid syntax — no markdown fences
-                    - Prefer flowchart for workflows/architectures,
-                      sequence for request/response interactions,
-                      class diagram for data structures
-                    - alt_text: a brief caption (5-8 words), NOT a paragraph"""
-                ),
-                HumanMessage(
-                    content=f"Create a Mermaid diagram for this blog section:\n\n"
-                    f"Title: {task.title}\nBrief: {task.brief}\n\n"
-                    f"Content:\n{section_content[:1000]}"
-                ),
-            ],
-            DiagramSpec,
-        )
-
-        mermaid_code = _clean_mermaid(spec.mermaid_code)
-        slug = re.sub(r"[^a-z0-9]+", "_", task.title.lower()).strip("_")
-        filename = f"{slug}.png"
-        image_path = (output_dir / filename).resolve()
-
-        try:
-            await clear.ainvoke({})
-            await create.ainvoke({"mermaidDiagram": mermaid_code})
-            await export.ainvoke({"format": "png", "filePath": str(image_path)})
-        except Exception as e:
-            logger.warning(f"MCP tool failed for '{task.title}': {e}, skipping.")
-            continue
-
-        if not image_path.exists():
-            logger.warning(f"Export did not create file at {image_path}, skipping.")
-            continue
-
-        if image_path.stat().st_size < MIN_IMAGE_BYTES:
-            logger.warning(
-                f"Blank image detected for '{task.title}' "
-                f"({image_path.stat().st_size} bytes), skipping."
-            )
-            image_path.unlink()
-            continue
-
-        logger.info(f"Saved diagram: {image_path}")
-
-        images.append(
-            ImageResult(
-                section_title=task.title,
-                image_path=str(image_path),
-                alt_text=spec.alt_text,
+    # Every spec is generated concurrently; each finished spec is handed to
+    # the renderer straight away, so rendering overlaps the remaining specs.
+    logger.info(f"Generating {len(image_tasks)} diagram specs ({renderer.name})")
+    specs = [
+        _diagram_spec(llm, context, task, content) for task, content in image_tasks
+    ]
+    renders = []
+    for next_spec in asyncio.as_completed(specs):
+        task, spec = await next_spec
+        logger.info(f"Queueing diagram render for: {task.title}")
+        renders.append(
+            asyncio.create_task(
+                _render_on(renderer, task, spec, output_dir), name=task.title
             )
         )
 
+    images = [image for image in await asyncio.gather(*renders) if image]
+
     return {"images": images, "token_usage": llm.usage}
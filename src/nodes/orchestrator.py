@@ -1,27 +1,26 @@
 from src.llm import LLM
 from src.models import Plan, State
+from src.prompts import blog_context
 from langchain_core.messages import SystemMessage, HumanMessage
 
 
-def orchestrator(state: State) -> dict:
+async def orchestrator(state: State) -> dict:
     llm = LLM(node_name="orchestrator")
     feedback = state.get("feedback")
     topic = state["topic"]
 
+    # A revision only appends to the first request, keeping its prefix cached.
+    messages = [HumanMessage(content=f"Create a blog post plan for the topic: {topic}")]
     if feedback:
-        previous_plan = state.get("plan")
-        prompt = f"""
-            The previous blog plan was rejected with the following feedback: {feedback}
-            Please create a revised blog post plan for the topic: {topic} that addresses this feedback.
-            Previous plan:
-            Title: {previous_plan.blog_title}
-            Sections:
-            {'\n'.join([f"- {t.title}: {t.brief}" for t in previous_plan.tasks])}
-        """
-    else:
-        prompt = f"Create a blog post plan for the topic: {topic}"
+        messages.append(
+            HumanMessage(
+                content="The previous plan was rejected. Create a revised plan that "
+                f"addresses this feedback: {feedback}\n\nPrevious plan:\n"
+                + blog_context(state["plan"], topic)
+            )
+        )
 
-    plan = llm.invoke_structured(
+    plan = await llm.ainvoke_structured(
         [
             SystemMessage(
                 content="""You are a senior technical writer who publishes on Medium.
@@ -49,7 +48,7 @@ def orchestrator(state: State) -> dict:
                     narrative sections, introductions, or conclusions.
                 """
             ),
-            HumanMessage(content=prompt),
+            *messages,
         ],
         Plan,
     )
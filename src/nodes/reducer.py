@@ -1,8 +1,28 @@
+import re
 from pathlib import Path
+
+from langchain_core.runnables import RunnableConfig
 from src.models import State
 
 
-def reducer(state: State):
+def _run_tag(thread_id: str) -> str:
+    # Blogs generated concurrently (batch mode, app sessions) may share
+    # titles and section titles; their files are told apart by thread.
+    return re.sub(r"[^\w-]+", "_", thread_id)[:8]
+
+
+def blog_path(title: str, thread_id: str) -> Path:
+    """Where the reducer writes the blog titled ``title`` for a thread."""
+    slug = title.lower().replace(" ", "_")
+    return Path("output") / f"{slug}_{_run_tag(thread_id)}.md"
+
+
+def images_dir(thread_id: str) -> Path:
+    """Where a thread's diagrams are rendered."""
+    return Path("output/images") / _run_tag(thread_id)
+
+
+def reducer(state: State, config: RunnableConfig):
     section_map = {s.title: s.content for s in state["sections"]}
     image_map = {img.section_title: img for img in state.get("images", [])}
 
@@ -18,9 +38,8 @@ def reducer(state: State):
     body = "\n\n".join(parts).strip()
     final_blog = f"# {title}\n\n{body}\n"
 
-    filename = title.lower().replace(" ", "_") + ".md"
-    output = Path("output")
-    output.mkdir(exist_ok=True)
-    Path(output / filename).write_text(final_blog, encoding="utf-8")
+    path = blog_path(title, config["configurable"]["thread_id"])
+    path.parent.mkdir(exist_ok=True)
+    path.write_text(final_blog, encoding="utf-8")
 
     return {"final": final_blog}
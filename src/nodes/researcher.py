@@ -1,15 +1,92 @@
+import asyncio
+import time
+
+from src.config import config
 from src.llm import LLM
 from src.models import ResearchResult
 from src.tools.search import web_search
 from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage
+from loguru import logger
+from pydantic import ValidationError
+
+
+def _gathered(messages: list) -> str:
+    """Everything the loop collected so far, for extraction after a budget stop."""
+    return "\n\n---\n\n".join(m.content for m in messages[3:] if m.content)
+
+
+def _submitted(response) -> ResearchResult | None:
+    """The ResearchResult the model submitted as a terminal tool call, if any."""
+    for tc in response.tool_calls:
+        if tc["name"] == ResearchResult.__name__:
+            try:
+                return ResearchResult.model_validate(tc["args"])
+            except ValidationError:
+                return None
+    return None
+
+
+async def _research_loop(
+    llm_with_tools: LLM, messages: list, title: str
+) -> str | ResearchResult:
+    """Run the tool-calling conversation within the per-section budgets and
+    return the raw research text, or the ResearchResult in single-call mode."""
+    deadline = time.monotonic() + config.RESEARCH_TIMEOUT
+    input_tokens = 0
+
+    for _ in range(config.RESEARCH_MAX_ROUNDS):
+        try:
+            response = await asyncio.wait_for(
+                llm_with_tools.ainvoke(messages), deadline - time.monotonic()
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Research deadline reached for '{title}'")
+            return _gathered(messages)
+
+        if not response.tool_calls:
+            return response.content
+
+        submitted = _submitted(response)
+        if submitted is not None:
+            return submitted
 
+        input_tokens += (response.usage_metadata or {}).get("input_tokens", 0)
+        if input_tokens >= config.RESEARCH_MAX_INPUT_TOKENS:
+            logger.warning(f"Research token budget reached for '{title}'")
+            return _gathered(messages)
 
-def researcher(payload: dict) -> dict:
+        searches = [tc for tc in response.tool_calls if tc["name"] == web_search.name]
+        messages.append(response)
+        try:
+            results = await asyncio.wait_for(
+                asyncio.gather(
+                    *(web_search.ainvoke(tc["args"]) for tc in searches)
+                ),
+                deadline - time.monotonic(),
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Research deadline reached for '{title}'")
+            return _gathered(messages)
+        by_id = {tc["id"]: result for tc, result in zip(searches, results)}
+        for tc in response.tool_calls:
+            content = by_id.get(tc["id"], f"Invalid {tc['name']} arguments, try again.")
+            messages.append(ToolMessage(content=content, tool_call_id=tc["id"]))
+
+    logger.warning(f"Research round limit reached for '{title}'")
+    return _gathered(messages)
+
+
+async def researcher(payload: dict) -> dict:
     task = payload["task"]
-    topic = payload["topic"]
+    search_results = payload.get("search_results")
 
     llm = LLM(node_name="researcher")
-    llm_with_tools = llm.with_tools([web_search])
+    if config.RESEARCH_SINGLE_CALL:
+        llm_with_tools = llm.with_tools(
+            [web_search, ResearchResult], tool_choice="required"
+        )
+    else:
+        llm_with_tools = llm.with_tools([web_search])
 
     messages = [
         SystemMessage(
@@ -18,26 +95,33 @@ def researcher(payload: dict) -> dict:
                     Focus on authoritative sources: official docs, reputable tech blogs, 
                     conference talks, or peer-reviewed content. Avoid forums, Q&A sites, or outdated content."""
         ),
+        HumanMessage(content=payload["blog_context"]),
         HumanMessage(
-            content=f"Research the topic '{task.title}' ({task.brief}) for a technical blog about '{topic}'. "
+            content=f"Research the section '{task.title}' ({task.brief}) of this blog. "
             f"Search for recent, authoritative sources."
         ),
     ]
 
-    response = llm_with_tools.invoke(messages)
+    if config.RESEARCH_SINGLE_CALL:
+        messages[2].content += (
+            f" When you have enough sources, call {ResearchResult.__name__} with "
+            f"section_title '{task.title}', the source URLs and the key findings."
+        )
 
-    while response.tool_calls:
-        messages.append(response)
-
-        for tc in response.tool_calls:
-            result = web_search.invoke(tc["args"])
-            messages.append(ToolMessage(content=result, tool_call_id=tc["id"]))
-
-        response = llm_with_tools.invoke(messages)
+    if search_results:
+        messages.append(
+            HumanMessage(
+                content=f"Search results already gathered for this section:\n\n{search_results}\n\n"
+                "Only call web_search if these don't cover the section."
+            )
+        )
 
-    raw_research = response.content
+    raw_research = await _research_loop(llm_with_tools, messages, task.title)
+    if isinstance(raw_research, ResearchResult):
+        research_result = raw_research.model_copy(update={"section_title": task.title})
+        return {"research": [research_result], "token_usage": llm.usage}
 
-    research_result = llm.invoke_structured(
+    research_result = await llm.ainvoke_structured(
         [
             SystemMessage(
                 content="Extract the research findings into a structured format. "
@@ -49,5 +133,7 @@ def researcher(payload: dict) -> dict:
         ],
         ResearchResult,
     )
+    # Research is merged by section title, so pin it to the task's title.
+    research_result = research_result.model_copy(update={"section_title": task.title})
 
     return {"research": [research_result], "token_usage": llm.usage}
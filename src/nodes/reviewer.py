@@ -1,9 +1,15 @@
+from langchain_core.runnables import RunnableConfig
 from langgraph.types import Command, interrupt
 from src.models import State
+from src.speculation import get_speculative_research
 
 
-def plan_review(state: State) -> Command:
+def plan_review(state: State, config: RunnableConfig) -> Command:
     plan = state["plan"]
+    # Runs again on resume; sections already being researched are skipped.
+    get_speculative_research().start(
+        config["configurable"]["thread_id"], plan, state["topic"]
+    )
 
     decision = interrupt(
         {
@@ -1,25 +1,82 @@
+from loguru import logger
+from src.config import config
 from src.llm import LLM
-from src.models import State
+from src.models import Section, SectionEdit, SectionPatch
 from langchain_core.messages import SystemMessage, HumanMessage
 
 
-def rewriter(state: State) -> dict:
+def apply_edits(content: str, edits: list[SectionEdit]) -> str | None:
+    """Apply edits in order; None if there are none or any ``find`` is not
+    found exactly once."""
+    if not edits:
+        return None
+    for edit in edits:
+        if not edit.find or content.count(edit.find) != 1:
+            return None
+        content = content.replace(edit.find, edit.replace)
+    return content
+
+
+def _section_prompt(payload: dict) -> list[HumanMessage]:
+    section = payload["section"]
+    return [
+        HumanMessage(content=payload["blog_context"]),
+        HumanMessage(
+            content=f"Section: {section.title}\n\n{section.content}\n\n"
+            f"Reviewer feedback:\n{payload['feedback']}"
+        ),
+    ]
+
+
+async def _patch(llm: LLM, payload: dict) -> str | None:
+    patch = await llm.ainvoke_structured(
+        [
+            SystemMessage(
+                content="""You are a senior technical editor. Fix one section of a
+                blog post to address the reviewer's feedback with as few edits as
+                possible. Each edit replaces a sentence or paragraph; copy the text
+                to replace verbatim from the section. Leave everything else as is."""
+            ),
+            *_section_prompt(payload),
+        ],
+        SectionPatch,
+    )
+    if patch is None:
+        return None
+    return apply_edits(payload["section"].content, patch.edits)
+
+
+async def rewriter(payload: dict) -> dict:
     llm = LLM(node_name="rewriter")
+    section = payload["section"]
 
-    improved = llm.invoke(
+    if config.REWRITER_PATCH:
+        patched = await _patch(llm, payload)
+        if patched is not None:
+            return {
+                "sections": [Section(title=section.title, content=patched.strip())],
+                "token_usage": llm.usage,
+            }
+        logger.warning(
+            f"Edits for '{section.title}' did not apply, rewriting the section in full"
+        )
+
+    response = await llm.ainvoke(
         [
             SystemMessage(
-                content="""You are a senior technical editor. Rewrite the blog post
-                to address the reviewer's feedback. Preserve the overall structure
-                (title, section headings, images) and improve only the areas called out.
+                content="""You are a senior technical editor. Rewrite one section of
+                a blog post to address the reviewer's feedback. Keep its voice,
+                citations and code, and improve only the areas called out.
 
-                Return the full improved blog in markdown."""
-            ),
-            HumanMessage(
-                content=f"Blog:\n\n{state['final']}\n\n"
-                f"Reviewer feedback:\n{state['eval_feedback']}"
+                Return only the markdown content of the section, without its heading."""
             ),
-        ]
-    ).content.strip()
+            *_section_prompt(payload),
+        ],
+        metadata={"section": section.title},
+    )
+    improved = response.content.strip()
 
-    return {"final": improved, "token_usage": llm.usage}
+    return {
+        "sections": [Section(title=section.title, content=improved)],
+        "token_usage": llm.usage,
+    }
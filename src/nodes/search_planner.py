@@ -0,0 +1,98 @@
+import asyncio
+
+from src.llm import LLM
+from src.models import SearchPlan, State
+from src.prompts import blog_context
+from src.tools.search import normalize_query, web_search
+from langchain_core.messages import SystemMessage, HumanMessage
+from loguru import logger
+
+SIMILARITY_THRESHOLD = 0.75
+
+
+def _similar(a: set[str], b: set[str]) -> bool:
+    union = a | b
+    if not union:
+        return True
+    return len(a & b) / len(union) >= SIMILARITY_THRESHOLD
+
+
+def _dedupe(queries: list[str]) -> tuple[list[str], list[int]]:
+    """Collapse duplicate and near-duplicate queries (by token overlap).
+    Returns the unique queries and, for each input, the index of its unique query."""
+    unique: list[str] = []
+    unique_tokens: list[set[str]] = []
+    mapping = []
+    for query in queries:
+        tokens = set(normalize_query(query).split())
+        match = next(
+            (i for i, seen in enumerate(unique_tokens) if _similar(tokens, seen)),
+            None,
+        )
+        if match is None:
+            unique.append(query)
+            unique_tokens.append(tokens)
+            match = len(unique) - 1
+        mapping.append(match)
+    return unique, mapping
+
+
+async def search_planner(state: State) -> dict:
+    researched = {r.section_title for r in state.get("research", [])}
+    tasks = [
+        t for t in state["plan"].tasks if t.needs_research and t.title not in researched
+    ]
+    if not tasks:
+        return {"search_results": {}}
+
+    llm = LLM(node_name="search_planner")
+
+    search_plan = await llm.ainvoke_structured(
+        [
+            SystemMessage(
+                content="""You plan web searches for the research sections of a technical blog.
+                For each section, write 2-3 focused search queries that would surface
+                recent, authoritative sources: official docs, reputable tech blogs,
+                conference talks, or benchmarks.
+
+                Sections of the same blog often overlap. When two sections need the
+                same fact, reuse the exact same query instead of rephrasing it.
+                Copy each section title exactly as given."""
+            ),
+            HumanMessage(content=blog_context(state["plan"], state["topic"])),
+            HumanMessage(
+                content="Plan searches for these sections:\n"
+                + "\n".join(f"- {t.title}" for t in tasks)
+            ),
+        ],
+        SearchPlan,
+    )
+
+    # Queries that normalize to nothing (e.g. "?") would search for nothing.
+    planned = {
+        s.section_title: [q for q in s.queries if normalize_query(q)]
+        for s in search_plan.sections
+    }
+    section_queries = [
+        (task.title, planned.get(task.title) or [f"{task.title} {state['topic']}"])
+        for task in tasks
+    ]
+
+    all_queries = [q for _, queries in section_queries for q in queries]
+    unique, mapping = _dedupe(all_queries)
+    logger.info(
+        f"Search plan: {len(all_queries)} queries, {len(unique)} after deduplication"
+    )
+
+    results = await asyncio.gather(
+        *(web_search.ainvoke({"query": q}) for q in unique)
+    )
+
+    search_results = {}
+    position = 0
+    for title, queries in section_queries:
+        indices = dict.fromkeys(mapping[position : position + len(queries)])
+        position += len(queries)
+        search_results[title] = "\n\n---\n\n".join(results[i] for i in indices)
+
+    return {"search_results": search_results, "token_usage": llm.usage}
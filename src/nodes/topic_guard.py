@@ -3,10 +3,10 @@ from src.models import TopicCheck, State
 from langchain_core.messages import SystemMessage, HumanMessage
 
 
-def topic_guard(state: State) -> dict:
+async def topic_guard(state: State) -> dict:
     llm = LLM(node_name="topic_guard")
 
-    result = llm.invoke_structured(
+    result = await llm.ainvoke_structured(
         [
             SystemMessage(
                 content="""You decide whether a topic is suitable for a technical engineering blog.
@@ -3,11 +3,9 @@ from langchain_core.messages import SystemMessage, HumanMessage
 from src.models import Section
 
 
-def worker(payload: dict) -> dict:
+async def worker(payload: dict) -> dict:
     llm = LLM(node_name="worker")
     task = payload["task"]
-    plan = payload["plan"]
-    topic = payload["topic"]
     research = payload.get("research")
 
     research_context = ""
@@ -18,7 +16,7 @@ def worker(payload: dict) -> dict:
             f"\n\nResearch findings:\n{findings}\n\nSources (cite inline):\n{sources}"
         )
 
-    section = llm.invoke(
+    response = await llm.ainvoke(
         [
             SystemMessage(
                 content="""You are a senior engineer who writes popular Medium blog posts.
@@ -41,15 +39,15 @@ def worker(payload: dict) -> dict:
                     [Source Title](URL) — don't dump all links at the end.
                 """
             ),
+            HumanMessage(content=payload["blog_context"]),
             HumanMessage(
-                content=f"""
-                    Write the section for the task: {task.title} ({task.brief}) 
-                    in the blog post titled '{plan.blog_title}' about the topic: {topic}.
-                    {research_context} Return only the markdown content of the section.
-                """
+                content=f"Write the section: {task.title} ({task.brief}){research_context}"
+                "\n\nReturn only the markdown content of the section."
             ),
-        ]
-    ).content.strip()
+        ],
+        metadata={"section": task.title},
+    )
+    section = response.content.strip()
 
     return {
         "sections": [Section(title=task.title, content=section)],
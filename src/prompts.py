@@ -0,0 +1,13 @@
+from src.models import Plan
+
+# Prompts are laid out as: static system prompt, then the blog context below,
+# then the per-section content. Every call for one blog then shares a
+# byte-identical prefix, which providers serve from their prompt cache.
+
+
+def blog_context(plan: Plan, topic: str) -> str:
+    """The per-blog part of a prompt: title, topic and the section outline."""
+    outline = "\n".join(
+        f"{i}. {task.title}: {task.brief}" for i, task in enumerate(plan.tasks, 1)
+    )
+    return f"Blog: {plan.blog_title}\nTopic: {topic}\n\nSections:\n{outline}"
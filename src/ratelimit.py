@@ -0,0 +1,310 @@
+import asyncio
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Literal
+
+from loguru import logger
+
+# How a failed call is treated: "throttled" shrinks the concurrency limit and
+# retries, "transient" only retries, None re-raises.
+Outcome = Literal["throttled", "transient"] | None
+
+
+def retry_after_header(error: BaseException) -> float | None:
+    """Seconds from the Retry-After header of an HTTP error's response."""
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """Refills ``per_minute`` units continuously, holding at most a minute's
+    worth. Takes may overdraw it; the debt is what the taker has to wait."""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60
+        self.capacity = per_minute
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def take(self, amount: float) -> float:
+        """Remove ``amount`` and return the seconds until the bucket is out of debt."""
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        self.level -= amount
+        return max(0.0, -self.level / self.rate)
+
+    def refund(self, amount: float):
+        self.level = min(self.capacity, self.level + amount)
+
+
+@dataclass
+class Permit:
+    """One admitted call: what it reserved and how long it queued for it."""
+
+    tokens: int
+    queue_wait: float
+    start: float = field(default_factory=time.monotonic)
+
+
+class AdaptiveLimiter:
+    """Process-wide admission control for one provider.
+
+    Requests per minute and tokens per minute are token buckets. Concurrency
+    is AIMD: the limit grows by one per limit's worth of successful calls,
+    and is cut by ``backoff`` on a 429 or when a call takes ``latency_spike``
+    times longer than usual for its ``key``. Waiters are plain
+    concurrent.futures futures, so runs on different event loops (Streamlit
+    sessions, batch runs, the CLI) share one limiter.
+    """
+
+    # Calls faster than this never count as latency spikes.
+    SPIKE_FLOOR = 1.0
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        rpm: float = 0,
+        tpm: float = 0,
+        classify: Callable[[BaseException], Outcome] = lambda e: None,
+        retry_after: Callable[[BaseException], float | None] = retry_after_header,
+        max_retries: int = 4,
+        backoff: float = 0.5,
+        latency_spike: float = 3.0,
+    ):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = float(self.max_concurrency)
+        self.classify = classify
+        self.retry_after = retry_after
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.latency_spike = latency_spike
+        self._rpm = TokenBucket(rpm) if rpm > 0 else None
+        self._tpm = TokenBucket(tpm) if tpm > 0 else None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiters: deque[Future] = deque()
+        self._latency: dict[str, tuple[float, int]] = {}
+        self._last_decrease = 0.0
+        self._stats = {
+            "calls": 0,
+            "throttled": 0,
+            "retries": 0,
+            "queue_wait": 0.0,
+            "max_wait": 0.0,
+        }
+
+    # -- admission ---------------------------------------------------------
+
+    def _reserve(self, tokens: int) -> tuple[float, Future | None]:
+        """Charge the buckets and take a slot, or queue for one. Returns the
+        bucket delay and the future to wait on (None if a slot was free)."""
+        with self._lock:
+            delay = 0.0
+            if self._rpm:
+                delay = max(delay, self._rpm.take(1))
+            if self._tpm and tokens:
+                delay = max(delay, self._tpm.take(tokens))
+            if not self._waiters and self._in_flight < int(self.limit):
+                self._in_flight += 1
+                return delay, None
+            waiter = Future()
+            self._waiters.append(waiter)
+            return delay, waiter
+
+    def _abandon(self, waiter: Future):
+        # A waiter that can no longer be cancelled was already handed a slot.
+        if not waiter.cancel():
+            self._release_slot()
+
+    async def acquire(self, tokens: int = 0) -> Permit:
+        start = time.monotonic()
+        delay, waiter = self._reserve(tokens)
+        try:
+            if waiter is not None:
+                await asyncio.wrap_future(waiter)
+            remaining = self._bucket_wait(delay, start)
+            if remaining:
+                await asyncio.sleep(remaining)
+        except asyncio.CancelledError:
+            if waiter is None:
+                self._release_slot()
+            else:
+                self._abandon(waiter)
+            raise
+        return self._admitted(tokens, start)
+
+    def acquire_blocking(self, tokens: int = 0) -> Permit:
+        start = time.monotonic()
+        delay, waiter = self._reserve(tokens)
+        if waiter is not None:
+            waiter.result()
+        remaining = self._bucket_wait(delay, start)
+        if remaining:
+            time.sleep(remaining)
+        return self._admitted(tokens, start)
+
+    @staticmethod
+    def _bucket_wait(delay: float, start: float) -> float:
+        # The bucket delay counts from the reservation, so time spent queued
+        # for a slot already paid for part of it.
+        return max(0.0, delay - (time.monotonic() - start))
+
+    def _admitted(self, tokens: int, start: float) -> Permit:
+        wait = time.monotonic() - start
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["queue_wait"] += wait
+            self._stats["max_wait"] = max(self._stats["max_wait"], wait)
+        return Permit(tokens=tokens, queue_wait=wait)
+
+    def _release_slot(self):
+        with self._lock:
+            self._in_flight -= 1
+            self._wake()
+
+    def _wake(self):
+        while self._waiters and self._in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.set_running_or_notify_cancel():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    # -- feedback ----------------------------------------------------------
+
+    def release(
+        self,
+        permit: Permit,
+        *,
+        key: str = "",
+        throttled: bool = False,
+        failed: bool = False,
+        used_tokens: int | None = None,
+    ):
+        """Return ``permit``'s slot and adjust the limit from how the call went.
+        Failures other than throttling leave the limit alone."""
+        latency = time.monotonic() - permit.start
+        with self._lock:
+            self._in_flight -= 1
+            if self._tpm and used_tokens is not None:
+                self._tpm.refund(permit.tokens - used_tokens)
+            if throttled:
+                self._stats["throttled"] += 1
+                self._decrease(permit, "rate limited")
+            elif failed:
+                pass
+            elif self._is_spike(key, latency):
+                self._decrease(permit, f"{latency:.1f}s {key or 'call'}")
+            elif self._in_flight + 1 >= int(self.limit):
+                # Only grow while the limit is what holds calls back.
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self._wake()
+
+    def _is_spike(self, key: str, latency: float) -> bool:
+        mean, samples = self._latency.get(key, (latency, 0))
+        self._latency[key] = (mean + (latency - mean) * 0.2, samples + 1)
+        if not self.latency_spike or samples < 5 or latency < self.SPIKE_FLOOR:
+            return False
+        return latency > mean * self.latency_spike
+
+    def _decrease(self, permit: Permit, reason: str):
+        # Calls admitted before the last cut saw the old limit; one cut per
+        # generation of calls, like TCP's once per round trip.
+        if permit.start <= self._last_decrease:
+            return
+        self._last_decrease = time.monotonic()
+        self.limit = max(1.0, self.limit * self.backoff)
+        logger.warning(
+            f"{self.name}: {reason}, concurrency limit now {int(self.limit)}"
+        )
+
+    # -- calls -------------------------------------------------------------
+
+    def _retry_delay(self, error: BaseException, attempt: int) -> float:
+        after = self.retry_after(error)
+        if after is not None:
+            return after
+        return min(60.0, 2**attempt) * random.uniform(0.5, 1.0)
+
+    def _failed(self, permit: Permit, error: Exception, key: str, attempt: int) -> bool:
+        """Release a failed call's permit; True if it should be retried."""
+        outcome = self.classify(error)
+        self.release(permit, key=key, throttled=outcome == "throttled", failed=True)
+        if outcome is None or attempt >= self.max_retries:
+            return False
+        with self._lock:
+            self._stats["retries"] += 1
+        return True
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        *,
+        tokens: int = 0,
+        key: str = "",
+        used_tokens: Callable[[Any], int | None] = lambda result: None,
+    ) -> tuple[Any, float]:
+        """Await ``fn()`` under a permit, retrying throttled and transient
+        failures with backoff. Returns the result and the seconds spent queued."""
+        queued = 0.0
+        for attempt in itertools.count():
+            permit = await self.acquire(tokens)
+            queued += permit.queue_wait
+            try:
+                result = await fn()
+            except Exception as e:
+                if not self._failed(permit, e, key, attempt):
+                    raise
+                await asyncio.sleep(self._retry_delay(e, attempt))
+                continue
+            except BaseException:
+                self.release(permit, key=key, failed=True)
+                raise
+            self.release(permit, key=key, used_tokens=used_tokens(result))
+            return result, queued
+
+    def call_blocking(
+        self,
+        fn: Callable[[], Any],
+        *,
+        tokens: int = 0,
+        key: str = "",
+        used_tokens: Callable[[Any], int | None] = lambda result: None,
+    ) -> tuple[Any, float]:
+        """Synchronous :meth:`call`."""
+        queued = 0.0
+        for attempt in itertools.count():
+            permit = self.acquire_blocking(tokens)
+            queued += permit.queue_wait
+            try:
+                result = fn()
+            except Exception as e:
+                if not self._failed(permit, e, key, attempt):
+                    raise
+                time.sleep(self._retry_delay(e, attempt))
+                continue
+            except BaseException:
+                self.release(permit, key=key, failed=True)
+                raise
+            self.release(permit, key=key, used_tokens=used_tokens(result))
+            return result, queued
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "limit": int(self.limit),
+                "in_flight": self._in_flight,
+                "waiting": len(self._waiters),
+            }
@@ -1,21 +1,204 @@
+import argparse
+import json
 import sys
+import time
 import uuid
 import asyncio
-from src.graph import build_graph
+from src.checkpoint import close_checkpointer
+from src.config import config as app_config
+from src.graph import GRAPH_MODES, build_graph
+from src.llm import get_llm_limiter, get_response_cache
+from src.models import TokenUsage, total_usage
+from src.nodes.reducer import blog_path
+from src.streaming import draft_token
+from src.tools.renderers import RENDERERS
+from src.tools.search import get_search_cache, get_search_limiter
+from src.tracing import Tracer, activate
 from langgraph.types import Command
 from collections import defaultdict
 
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate a technical blog post.")
+    parser.add_argument("topic", nargs="?", help="Topic to write about")
+    parser.add_argument(
+        "--renderer",
+        choices=sorted(RENDERERS),
+        help="Diagram backend for this run (default: DIAGRAM_RENDERER)",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=GRAPH_MODES,
+        help="Graph layout: staged fan-outs or per-section pipelines (default: GRAPH_MODE)",
+    )
+    parser.add_argument(
+        "--no-stream",
+        action="store_true",
+        help="Don't print section drafts while they are being written",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="THREAD_ID",
+        help="Continue a checkpointed run (needs CHECKPOINT_PATH and the same --mode)",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        help="Write a Chrome trace (chrome://tracing, Perfetto) of nodes, LLM and tool calls",
+    )
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Generate one blog per line of FILE ('-' for stdin), approving every plan",
+    )
+    batch.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Blogs generated at the same time in batch mode (default: 4)",
+    )
+    batch.add_argument(
+        "--llm-concurrency",
+        type=int,
+        help="Cap on in-flight LLM requests across all blogs (default: LLM_MAX_CONCURRENCY)",
+    )
+    batch.add_argument(
+        "--summary",
+        metavar="PATH",
+        default="batch_summary.jsonl",
+        help="JSONL file that gets one line per finished topic (default: %(default)s)",
+    )
+    args = parser.parse_args()
+    if not args.topic and not args.resume and not args.batch:
+        parser.error("a topic is required unless --resume or --batch is given")
+    if args.batch and (args.topic or args.resume):
+        parser.error("--batch can't be combined with a topic or --resume")
+    return args
+
+
+class DraftPrinter:
+    """Prints streamed draft tokens a line at a time, prefixed with their
+    section, so concurrently written sections interleave readably."""
+
+    def __init__(self):
+        self._pending: dict[str, str] = defaultdict(str)
+
+    def feed(self, label: str, text: str):
+        *lines, self._pending[label] = (self._pending[label] + text).split("\n")
+        for line in lines:
+            print(f"[{label}] {line}")
+
+    def flush(self):
+        for label, rest in self._pending.items():
+            if rest:
+                print(f"[{label}] {rest}")
+        self._pending.clear()
+
+
+async def run_graph(app, graph_input, config: dict, stream: bool):
+    """Run the graph until it finishes or pauses, echoing drafts if asked."""
+    if not stream:
+        await app.ainvoke(graph_input, config=config)
+        return
+    printer = DraftPrinter()
+    async for _, (chunk, metadata) in app.astream(
+        graph_input, config=config, stream_mode="messages", subgraphs=True
+    ):
+        token = draft_token(chunk, metadata)
+        if token:
+            printer.feed(*token)
+    printer.flush()
+
+
+def print_usage(token_usage: dict[str, TokenUsage]):
+    total = total_usage(token_usage)
+    print(f"\nToken Usage Summary:")
+    print(f"  Input:  {total.input_tokens:,}")
+    print(f"  Output: {total.output_tokens:,}")
+    print(f"  Total:  {total.total_tokens:,}")
+    if total.cache_read_tokens:
+        print(
+            f"  Prompt cache: {total.cache_read_tokens:,} input tokens "
+            f"({total.cache_hit_ratio:.0%} hit rate)"
+        )
+    if total.cached_tokens:
+        print(f"  Served from cache: {total.cached_tokens:,}")
+    print(f"  Model time: {total.latency:.1f}s over {total.calls} calls")
+    if total.queue_wait:
+        print(f"  Queued for rate limits: {total.queue_wait:.1f}s")
+    if total.cost:
+        print(f"  Estimated cost: ${total.cost:.4f}")
+
+    print("\nBreakdown by node:")
+    for node, usage in token_usage.items():
+        line = (
+            f"  {node}: {usage.total_tokens:,} tokens, {usage.calls} calls, "
+            f"{usage.latency:.1f}s, {usage.cache_hit_ratio:.0%} prompt cache hits"
+        )
+        if usage.cost:
+            line += f", ${usage.cost:.4f}"
+        if usage.cached_tokens:
+            line += f" (+{usage.cached_tokens:,} cached)"
+        if usage.queue_wait:
+            line += f", {usage.queue_wait:.1f}s queued"
+        print(line)
+
+
+def print_limiter_stats():
+    limiters = (("LLM", get_llm_limiter()), ("Search", get_search_limiter()))
+    for label, limiter in limiters:
+        stats = limiter.stats()
+        if not stats["calls"]:
+            continue
+        print(
+            f"\n{label} rate limiter: {stats['calls']} calls, "
+            f"{stats['throttled']} rate limited, {stats['retries']} retries, "
+            f"{stats['queue_wait']:.1f}s queued (max {stats['max_wait']:.1f}s), "
+            f"concurrency limit {stats['limit']}"
+        )
+
+
 async def main():
-    if len(sys.argv) > 1:
-        topic = sys.argv[1]
-    else:
-        raise ValueError("Please provide a topic as a command line argument.")
+    args = parse_args()
+    tracer = Tracer() if args.trace else None
+    activate(tracer)
+    try:
+        if args.batch:
+            await generate_batch(args, tracer)
+        else:
+            await generate(args, tracer)
+    finally:
+        await close_checkpointer()
+        if tracer:
+            tracer.export(args.trace)
+            print(f"\nTrace written to {args.trace} ({len(tracer.spans)} spans)")
 
-    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
 
-    app = build_graph()
-    await app.ainvoke({"topic": topic}, config=config)
+async def generate(args: argparse.Namespace, tracer: Tracer | None = None):
+    thread_id = args.resume or str(uuid.uuid4())
+    config = {"configurable": {"thread_id": thread_id}}
+    if tracer:
+        config["callbacks"] = [tracer]
+
+    app = build_graph(args.mode)
+    stream = not args.no_stream
+
+    if args.resume:
+        state = await app.aget_state(config)
+        if not state.values:
+            print(f"No checkpoint found for thread {thread_id}")
+            return
+        if state.next and not state.interrupts:
+            # Interrupted mid-run: continue from the last checkpoint; tasks
+            # whose writes were saved are not run again.
+            await run_graph(app, None, config, stream)
+    else:
+        print(f"Thread: {thread_id}")
+        inputs = {"topic": args.topic}
+        if args.renderer:
+            inputs["diagram_renderer"] = args.renderer
+        await run_graph(app, inputs, config, stream)
 
     state = await app.aget_state(config)
 
@@ -31,44 +214,127 @@ async def main():
 
         print(interrupt_value.get("plan", ""))
 
-        user_input = input("\nPress ENTER to approve, or type feedback: ").strip()
+        # Off the event loop, so background work keeps running during review.
+        user_input = (
+            await asyncio.to_thread(input, "\nPress ENTER to approve, or type feedback: ")
+        ).strip()
 
         if not user_input:
             resume_value = {"action": "approve"}
         else:
             resume_value = {"action": "reject", "feedback": user_input}
 
-        await app.ainvoke(Command(resume=resume_value), config=config)
+        await run_graph(app, Command(resume=resume_value), config, stream)
 
         state = await app.aget_state(config)
 
     final_state = await app.aget_state(config)
-    token_usage = final_state.values.get("token_usage", [])
+    token_usage = final_state.values.get("token_usage", {})
 
     print(f"\n{'='*50}")
     print("Blog generation complete!")
+    print_usage(token_usage)
 
-    by_node = defaultdict(lambda: {"input": 0, "output": 0})
-    total_input, total_output = 0, 0
-    for t in token_usage:
-        by_node[t.node]["input"] += t.input_tokens
-        by_node[t.node]["output"] += t.output_tokens
-        total_input += t.input_tokens
-        total_output += t.output_tokens
+    for label, cache in (
+        ("Response cache", get_response_cache()),
+        ("Search cache", get_search_cache()),
+    ):
+        if cache is not None:
+            stats = cache.stats()
+            print(
+                f"\n{label}: {stats['hits']} hits, {stats['misses']} misses "
+                f"({stats['hit_rate']:.0%} hit rate)"
+            )
+    print_limiter_stats()
 
-    print(f"\nToken Usage Summary:")
-    print(f"  Input:  {total_input:,}")
-    print(f"  Output: {total_output:,}")
-    print(f"  Total:  {total_input + total_output:,}")
-    print("\nBreakdown by node:")
-    for node, counts in by_node.items():
-        print(f"  {node}: {counts['input'] + counts['output']:,} tokens")
+
+def read_topics(path: str) -> list[str]:
+    """One topic per line; blank lines and lines starting with # are skipped."""
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.startswith("#")]
 
 
-if __name__ == "__main__":
-    from time import time
+async def generate_unattended(app, topic: str, args, tracer: Tracer | None) -> dict:
+    """Run one topic to completion, approving each plan, and summarize it."""
+    thread_id = str(uuid.uuid4())
+    config = {"configurable": {"thread_id": thread_id}}
+    if tracer:
+        config["callbacks"] = [tracer]
+    inputs = {"topic": topic}
+    if args.renderer:
+        inputs["diagram_renderer"] = args.renderer
+
+    record = {"topic": topic, "thread_id": thread_id, "status": "done"}
+    start = time.perf_counter()
+    values = {}
+    try:
+        await app.ainvoke(inputs, config=config)
+        state = await app.aget_state(config)
+        while state.interrupts:
+            await app.ainvoke(Command(resume={"action": "approve"}), config=config)
+            state = await app.aget_state(config)
+        values = state.values
+        if values.get("topic_error"):
+            record.update(status="rejected", error=values["topic_error"])
+        else:
+            record["output"] = str(blog_path(values["plan"].blog_title, thread_id))
+    except Exception as e:
+        record.update(status="failed", error=repr(e))
+        values = (await app.aget_state(config)).values
 
-    start_time = time()
+    token_usage = values.get("token_usage", {})
+    record["duration"] = round(time.perf_counter() - start, 2)
+    record["token_usage"] = {
+        "total": total_usage(token_usage).model_dump(),
+        **{node: usage.model_dump() for node, usage in token_usage.items()},
+    }
+    return record
+
+
+async def generate_batch(args: argparse.Namespace, tracer: Tracer | None = None):
+    topics = read_topics(args.batch)
+    if not topics:
+        print("No topics to generate")
+        return
+    if args.llm_concurrency is not None:
+        app_config.LLM_MAX_CONCURRENCY = args.llm_concurrency
+
+    # One compiled graph serves every topic; runs are kept apart by thread ID.
+    app = build_graph(args.mode)
+    runs = asyncio.Semaphore(max(1, args.concurrency))
+    finished = 0
+
+    async def run(topic: str) -> dict:
+        nonlocal finished
+        async with runs:
+            record = await generate_unattended(app, topic, args, tracer)
+        # Appended as each topic finishes, so an interrupted batch keeps its results.
+        with open(args.summary, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        finished += 1
+        print(
+            f"[{finished}/{len(topics)}] {record['status']}: {topic} "
+            f"({record['duration']:.1f}s)"
+        )
+        return record
+
+    print(f"Generating {len(topics)} blogs, {args.concurrency} at a time")
+    records = await asyncio.gather(*(run(topic) for topic in topics))
+
+    done = sum(r["status"] == "done" for r in records)
+    tokens = sum(r["token_usage"]["total"]["input_tokens"] for r in records) + sum(
+        r["token_usage"]["total"]["output_tokens"] for r in records
+    )
+    print(f"\n{done}/{len(records)} blogs generated, {tokens:,} tokens")
+    print(f"Summary appended to {args.summary}")
+    print_limiter_stats()
+
+
+if __name__ == "__main__":
+    start_time = time.perf_counter()
     asyncio.run(main())
-    end_time = time()
-    print(f"\nTotal execution time: {end_time - start_time:.2f} seconds")
+    print(f"\nTotal execution time: {time.perf_counter() - start_time:.2f} seconds")
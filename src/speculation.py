@@ -0,0 +1,152 @@
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+from langchain_core.runnables.config import var_child_runnable_config
+from loguru import logger
+from src.config import config
+from src.llm import recording_usage
+from src.models import Plan, TokenUsage, total_usage
+from src.nodes.researcher import researcher
+from src.prompts import blog_context
+from src.tracing import span
+
+
+@dataclass
+class _Speculation:
+    future: Future
+    # Every call the research made, including ones before a cancellation.
+    usage: TokenUsage = field(default_factory=TokenUsage)
+
+
+@dataclass
+class _ThreadRuns:
+    tasks: dict[str, _Speculation] = field(default_factory=dict)
+    touched: float = field(default_factory=time.monotonic)
+
+
+class SpeculativeResearch:
+    """Researches a proposed plan's sections while the plan waits for review.
+
+    Research runs on a dedicated event loop thread, because the loop that
+    produced the plan is idle (Streamlit) or blocked (CLI input) until the
+    reviewer answers. Results are kept per graph thread and task title: a
+    rejected plan's research is reused by the tasks that survive the
+    revision, and approval hands it to the graph through :meth:`collect`.
+    Threads that are not approved within SPECULATIVE_RESEARCH_TTL seconds
+    (abandoned sessions) are dropped and their research cancelled.
+    """
+
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+        self._runs: dict[str, _ThreadRuns] = {}
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._loop is not None:
+                return
+            ready = threading.Event()
+
+            def serve():
+                self._loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(self._loop)
+                ready.set()
+                self._loop.run_forever()
+
+            threading.Thread(
+                target=serve, name="speculative-research", daemon=True
+            ).start()
+            ready.wait()
+
+    def start(self, thread_id: str, plan: Plan, topic: str):
+        """Start research for the plan's tasks that have none yet. A no-op
+        unless SPECULATIVE_RESEARCH is set."""
+        if not config.SPECULATIVE_RESEARCH:
+            return
+        self._ensure_started()
+        # Detached from the reviewing run: its callbacks and stream are gone
+        # by the time the research finishes. Tracing still applies.
+        context = contextvars.copy_context()
+        context.run(var_child_runnable_config.set, None)
+        payload = {"blog_context": blog_context(plan, topic), "search_results": ""}
+
+        with self._lock:
+            self._expire()
+            runs = self._runs.setdefault(thread_id, _ThreadRuns())
+            runs.touched = time.monotonic()
+            for task in plan.tasks:
+                if task.needs_research and task.title not in runs.tasks:
+                    usage = TokenUsage()
+                    research = self._research(
+                        {**payload, "task": task}, usage, context.copy()
+                    )
+                    future = asyncio.run_coroutine_threadsafe(research, self._loop)
+                    runs.tasks[task.title] = _Speculation(future, usage)
+                    logger.info(f"Speculatively researching '{task.title}'")
+
+    def _expire(self):
+        deadline = time.monotonic() - config.SPECULATIVE_RESEARCH_TTL
+        expired = [t for t, runs in self._runs.items() if runs.touched < deadline]
+        for thread_id in expired:
+            runs = self._runs.pop(thread_id)
+            for speculation in runs.tasks.values():
+                speculation.future.cancel()
+            usage = total_usage({t: s.usage for t, s in runs.tasks.items()})
+            logger.info(
+                f"Dropped speculative research of unapproved thread {thread_id} "
+                f"({usage.total_tokens:,} tokens spent)"
+            )
+
+    async def _research(
+        self, payload: dict, usage: TokenUsage, context: contextvars.Context
+    ) -> dict:
+        async def run():
+            with span("speculative_research", "node", section=payload["task"].title):
+                with recording_usage(usage):
+                    return await researcher(payload)
+
+        return await asyncio.create_task(run(), context=context)
+
+    async def collect(self, thread_id: str, plan: Plan) -> dict:
+        """Wait for the thread's research on the approved plan and return it
+        as a state update. Research for tasks the plan dropped is cancelled;
+        the tokens it spent are still counted."""
+        with self._lock:
+            runs = self._runs.pop(thread_id, None)
+        if runs is None:
+            return {}
+        wanted = [
+            t.title for t in plan.tasks if t.needs_research and t.title in runs.tasks
+        ]
+        for title, speculation in runs.tasks.items():
+            if title not in wanted:
+                speculation.future.cancel()
+
+        updates = await asyncio.gather(
+            *(asyncio.wrap_future(runs.tasks[title].future) for title in wanted),
+            return_exceptions=True,
+        )
+        research = []
+        for title, update in zip(wanted, updates):
+            if isinstance(update, BaseException):
+                logger.warning(f"Speculative research for '{title}' failed: {update}")
+                continue
+            research += update["research"]
+        if research:
+            logger.info(f"Using speculative research for {len(research)} sections")
+        usage = total_usage({t: s.usage for t, s in runs.tasks.items()})
+        return {"research": research, "token_usage": {"researcher": usage}}
+
+
+_speculation: SpeculativeResearch | None = None
+
+
+def get_speculative_research() -> SpeculativeResearch:
+    global _speculation
+    if _speculation is None:
+        _speculation = SpeculativeResearch()
+    return _speculation
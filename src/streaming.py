@@ -0,0 +1,19 @@
+from langchain_core.messages import AIMessageChunk
+
+# Nodes whose LLM output is prose worth showing while it is generated.
+STREAMED_NODES = ("worker", "rewriter")
+
+
+def draft_token(chunk, metadata: dict) -> tuple[str, str] | None:
+    """Return (label, text) for a streamed draft token, else None.
+
+    ``chunk, metadata`` is one item of LangGraph's "messages" stream mode.
+    Workers and rewriters tag their calls with the section title; untagged
+    calls are labelled by node name.
+    """
+    node = metadata.get("langgraph_node")
+    if node not in STREAMED_NODES or not isinstance(chunk, AIMessageChunk):
+        return None
+    if not isinstance(chunk.content, str) or not chunk.content:
+        return None
+    return metadata.get("section") or node, chunk.content
@@ -1,25 +1,165 @@
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
+from loguru import logger
 from src.config import config
 
-MCP_CONFIG = {
-    "excalidraw": {
-        "transport": "stdio",
-        "command": "node",
-        "args": [config.EXCALIDRAW_PATH],
-        "env": {"EXPRESS_SERVER_URL": config.EXCALIDRAW_SERVER_URL},
+RESTART_BACKOFF = 2.0
+
+
+def mcp_config(server_url: str) -> dict:
+    return {
+        "excalidraw": {
+            "transport": "stdio",
+            "command": "node",
+            "args": [config.EXCALIDRAW_PATH],
+            "env": {"EXPRESS_SERVER_URL": server_url},
+        }
     }
-}
 
-_client: MultiServerMCPClient | None = None
-_tools: list = []
+
+@dataclass
+class _Job:
+    fn: Callable[[list], Awaitable[Any]]
+    future: Future
+    enqueued: float = field(default_factory=time.monotonic)
+    # The caller's context, so tracing spans and run config carry over to
+    # the pool's loop thread.
+    context: contextvars.Context = field(default_factory=contextvars.copy_context)
+
+
+class ExcalidrawPool:
+    """Pool of Excalidraw MCP server processes, one per canvas server URL.
+
+    Each member keeps a persistent stdio session open in its own task and
+    takes rendering jobs from a shared queue, so a canvas only ever renders
+    one diagram at a time. Members live on a dedicated event loop thread:
+    MCP sessions must be closed by the task that opened them, and the pool
+    is shared by every graph run in the process (CLI, batch, Streamlit).
+    """
+
+    def __init__(self, server_urls: list[str]):
+        self._server_urls = server_urls
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._jobs: asyncio.Queue | None = None
+        self._lock = threading.Lock()
+        self.jobs_done = 0
+        self.restarts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self._server_urls)
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._loop is not None:
+                return
+            ready = threading.Event()
+
+            def serve():
+                self._loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(self._loop)
+                self._jobs = asyncio.Queue()
+                for index, url in enumerate(self._server_urls):
+                    self._loop.create_task(self._member(index, url))
+                ready.set()
+                self._loop.run_forever()
+
+            threading.Thread(target=serve, name="excalidraw-pool", daemon=True).start()
+            ready.wait()
+
+    async def _member(self, index: int, url: str):
+        client = MultiServerMCPClient(mcp_config(url))
+        while True:
+            try:
+                async with client.session("excalidraw") as session:
+                    tools = await load_mcp_tools(session)
+                    logger.info(f"Excalidraw worker {index} ready ({url})")
+                    while True:
+                        job = await self._jobs.get()
+                        if job.future.cancelled():
+                            continue
+                        try:
+                            await session.send_ping()
+                        except Exception:
+                            self._jobs.put_nowait(job)
+                            raise
+                        if not job.future.set_running_or_notify_cancel():
+                            continue
+                        self._record_wait(time.monotonic() - job.enqueued)
+                        task = asyncio.create_task(job.fn(tools), context=job.context)
+                        done, _ = await asyncio.wait(
+                            {task}, timeout=config.EXCALIDRAW_TIMEOUT
+                        )
+                        if not done:
+                            # The job is stuck on a stdio call that may never
+                            # answer; only a new session frees the canvas.
+                            task.cancel()
+                            job.future.set_exception(asyncio.TimeoutError())
+                            raise TimeoutError(
+                                f"job timed out after {config.EXCALIDRAW_TIMEOUT:g}s"
+                            )
+                        try:
+                            job.future.set_result(task.result())
+                        except Exception as e:
+                            job.future.set_exception(e)
+            except Exception as e:
+                self.restarts += 1
+                logger.warning(
+                    f"Excalidraw worker {index} failed: {e}, restarting "
+                    f"in {RESTART_BACKOFF:.0f}s."
+                )
+                await asyncio.sleep(RESTART_BACKOFF)
+
+    def _record_wait(self, wait: float):
+        self.jobs_done += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    async def run(self, fn: Callable[[list], Awaitable[Any]]) -> Any:
+        """Run ``fn(tools)`` on the next free canvas and return its result."""
+        if not self._server_urls:
+            raise RuntimeError("EXCALIDRAW_SERVER_URL is not configured")
+        self._ensure_started()
+        job = _Job(fn=fn, future=Future())
+        self._loop.call_soon_threadsafe(self._jobs.put_nowait, job)
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(job.future), config.EXCALIDRAW_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            job.future.cancel()
+            raise
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "jobs": self.jobs_done,
+            "restarts": self.restarts,
+            "queued": self._jobs.qsize() if self._jobs else 0,
+            "avg_wait": self.total_wait / self.jobs_done if self.jobs_done else 0.0,
+            "max_wait": self.max_wait,
+        }
+
+
+_pool: ExcalidrawPool | None = None
 
 
-async def get_excalidraw_tools():
-    global _client, _tools
-    if not _tools:
-        _client = MultiServerMCPClient(MCP_CONFIG)
-        _tools = await _client.get_tools()
-    return _tools
+def get_excalidraw_pool() -> ExcalidrawPool:
+    global _pool
+    if _pool is None:
+        urls = [u.strip() for u in (config.EXCALIDRAW_SERVER_URL or "").split(",")]
+        _pool = ExcalidrawPool([u for u in urls if u])
+    return _pool
 
 
 def get_tool_by_name(tools, name: str):
@@ -0,0 +1,659 @@
+"""Pure-Python renderer for the Mermaid subset the diagram prompt allows:
+flowcharts (graph/flowchart TD, TB, BT, LR, RL), sequence diagrams and class
+diagrams with roughly 5-10 nodes. Output is a standalone SVG file."""
+
+import re
+from dataclasses import dataclass, field
+from html import escape
+
+FONT_SIZE = 14
+CHAR_WIDTH = 7.8
+LINE_HEIGHT = 18
+PAD_X = 16
+PAD_Y = 10
+MIN_NODE_WIDTH = 80
+LAYER_GAP = 70
+NODE_GAP = 40
+MARGIN = 24
+
+STROKE = "#1e1e1e"
+FILL = "#e7f0ff"
+NOTE_FILL = "#fff5c2"
+FONT = "Helvetica, Arial, sans-serif"
+
+_BR_RE = re.compile(r"<br\s*/?>", re.IGNORECASE)
+
+
+# ---------------------------------------------------------------------------
+# Shared model + layout
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class Node:
+    id: str
+    label: str
+    shape: str = "rect"
+    members: list[str] = field(default_factory=list)
+    x: float = 0
+    y: float = 0
+    w: float = 0
+    h: float = 0
+
+
+@dataclass
+class Edge:
+    src: str
+    dst: str
+    label: str = ""
+    style: str = "solid"
+    head: str = "arrow"
+    tail: str = "none"
+
+
+def _lines(label: str) -> list[str]:
+    return [part.strip() for part in _BR_RE.sub("\n", label).split("\n")]
+
+
+def _text_width(text: str) -> float:
+    return len(text) * CHAR_WIDTH
+
+
+def _size(node: Node):
+    lines = _lines(node.label)
+    width = max(_text_width(line) for line in lines) + 2 * PAD_X
+    height = len(lines) * LINE_HEIGHT + 2 * PAD_Y
+    if node.members:
+        width = max(width, max(_text_width(m) for m in node.members) + 2 * PAD_X)
+        height += len(node.members) * LINE_HEIGHT + PAD_Y
+    if node.shape == "diamond":
+        width, height = width * 1.4, height * 1.4
+    elif node.shape == "circle":
+        width = height = max(width, height)
+    node.w = max(width, MIN_NODE_WIDTH)
+    node.h = height
+
+
+def _layers(nodes: dict[str, Node], edges: list[Edge]) -> list[list[str]]:
+    """Longest-path layering with back edges ignored, then barycenter ordering."""
+    succ: dict[str, list[str]] = {n: [] for n in nodes}
+    for e in edges:
+        if e.src != e.dst:
+            succ[e.src].append(e.dst)
+
+    order, state = [], {}
+
+    def visit(n):
+        state[n] = "active"
+        for m in succ[n]:
+            if state.get(m) is None:
+                visit(m)
+        state[n] = "done"
+        order.append(n)
+
+    for n in nodes:
+        if state.get(n) is None:
+            visit(n)
+    order.reverse()
+    position = {n: i for i, n in enumerate(order)}
+
+    layer = {n: 0 for n in nodes}
+    for n in order:
+        for m in succ[n]:
+            if position[m] > position[n]:
+                layer[m] = max(layer[m], layer[n] + 1)
+
+    layers: list[list[str]] = [[] for _ in range(max(layer.values(), default=0) + 1)]
+    for n in nodes:
+        layers[layer[n]].append(n)
+
+    preds: dict[str, list[str]] = {n: [] for n in nodes}
+    for n, targets in succ.items():
+        for m in targets:
+            preds[m].append(n)
+    for _ in range(2):
+        for i in range(1, len(layers)):
+            index = {n: j for j, n in enumerate(layers[i - 1])}
+
+            def barycenter(n):
+                ps = [index[p] for p in preds[n] if p in index]
+                return sum(ps) / len(ps) if ps else float("inf")
+
+            layers[i].sort(key=barycenter)
+    return layers
+
+
+def _place(nodes: dict[str, Node], layers: list[list[str]], direction: str):
+    horizontal = direction in ("LR", "RL")
+    for n in nodes.values():
+        _size(n)
+
+    depth = [
+        max((nodes[n].w if horizontal else nodes[n].h) for n in layer) if layer else 0
+        for layer in layers
+    ]
+    breadth = [
+        sum((nodes[n].h if horizontal else nodes[n].w) for n in layer)
+        + NODE_GAP * (len(layer) - 1)
+        for layer in layers
+    ]
+    widest = max(breadth, default=0)
+
+    offset = MARGIN
+    for i, layer in enumerate(layers):
+        cursor = MARGIN + (widest - breadth[i]) / 2
+        for n in layer:
+            node = nodes[n]
+            along = node.h if horizontal else node.w
+            if horizontal:
+                node.x = offset + (depth[i] - node.w) / 2
+                node.y = cursor
+            else:
+                node.x = cursor
+                node.y = offset + (depth[i] - node.h) / 2
+            cursor += along + NODE_GAP
+        offset += depth[i] + LAYER_GAP
+
+    total = offset - LAYER_GAP + MARGIN
+    if direction in ("BT", "RL"):
+        for node in nodes.values():
+            if horizontal:
+                node.x = total - node.x - node.w
+            else:
+                node.y = total - node.y - node.h
+
+
+def _clip(node: Node, tx: float, ty: float) -> tuple[float, float]:
+    """Point where the segment from the node center towards (tx, ty) leaves its box."""
+    cx, cy = node.x + node.w / 2, node.y + node.h / 2
+    dx, dy = tx - cx, ty - cy
+    if dx == 0 and dy == 0:
+        return cx, cy
+    scale = min(
+        (node.w / 2) / abs(dx) if dx else float("inf"),
+        (node.h / 2) / abs(dy) if dy else float("inf"),
+    )
+    return cx + dx * scale, cy + dy * scale
+
+
+# ---------------------------------------------------------------------------
+# SVG helpers
+# ---------------------------------------------------------------------------
+
+_DEFS = f"""<defs>
+<marker id="arrow" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="9" markerHeight="9" markerUnits="userSpaceOnUse" orient="auto-start-reverse"><path d="M0,0 L10,5 L0,10 z" fill="{STROKE}"/></marker>
+<marker id="open" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="9" markerHeight="9" markerUnits="userSpaceOnUse" orient="auto-start-reverse"><path d="M0,0 L10,5 L0,10" fill="none" stroke="{STROKE}"/></marker>
+<marker id="triangle" viewBox="0 0 12 12" refX="12" refY="6" markerWidth="12" markerHeight="12" markerUnits="userSpaceOnUse" orient="auto-start-reverse"><path d="M0,0 L12,6 L0,12 z" fill="#ffffff" stroke="{STROKE}"/></marker>
+<marker id="diamond" viewBox="0 0 16 10" refX="16" refY="5" markerWidth="16" markerHeight="10" markerUnits="userSpaceOnUse" orient="auto-start-reverse"><path d="M0,5 L8,0 L16,5 L8,10 z" fill="#ffffff" stroke="{STROKE}"/></marker>
+<marker id="filled_diamond" viewBox="0 0 16 10" refX="16" refY="5" markerWidth="16" markerHeight="10" markerUnits="userSpaceOnUse" orient="auto-start-reverse"><path d="M0,5 L8,0 L16,5 L8,10 z" fill="{STROKE}"/></marker>
+</defs>"""
+
+
+def _text(x: float, y: float, label: str, anchor: str = "middle", weight: str = "normal") -> str:
+    lines = _lines(label)
+    top = y - (len(lines) - 1) * LINE_HEIGHT / 2
+    spans = "".join(
+        f'<tspan x="{x:.1f}" y="{top + i * LINE_HEIGHT:.1f}">{escape(line)}</tspan>'
+        for i, line in enumerate(lines)
+    )
+    return (
+        f'<text text-anchor="{anchor}" dominant-baseline="central" '
+        f'font-weight="{weight}">{spans}</text>'
+    )
+
+
+def _label_box(x: float, y: float, label: str) -> str:
+    lines = _lines(label)
+    w = max(_text_width(line) for line in lines) + 8
+    h = len(lines) * LINE_HEIGHT + 4
+    return (
+        f'<rect x="{x - w / 2:.1f}" y="{y - h / 2:.1f}" width="{w:.1f}" '
+        f'height="{h:.1f}" fill="#ffffff"/>' + _text(x, y, label)
+    )
+
+
+def _svg(width: float, height: float, body: list[str]) -> str:
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" '
+        f'height="{height:.0f}" viewBox="0 0 {width:.0f} {height:.0f}" '
+        f'font-family="{FONT}" font-size="{FONT_SIZE}">'
+        f'{_DEFS}<rect width="100%" height="100%" fill="#ffffff"/>'
+        + "".join(body)
+        + "</svg>"
+    )
+
+
+def _node_svg(node: Node) -> str:
+    x, y, w, h = node.x, node.y, node.w, node.h
+    cx, cy = x + w / 2, y + h / 2
+    style = f'fill="{FILL}" stroke="{STROKE}" stroke-width="1.5"'
+    if node.shape == "diamond":
+        shape = (
+            f'<polygon points="{cx:.1f},{y:.1f} {x + w:.1f},{cy:.1f} '
+            f'{cx:.1f},{y + h:.1f} {x:.1f},{cy:.1f}" {style}/>'
+        )
+    elif node.shape == "circle":
+        shape = f'<circle cx="{cx:.1f}" cy="{cy:.1f}" r="{w / 2:.1f}" {style}/>'
+    else:
+        radius = {"round": 10, "stadium": h / 2}.get(node.shape, 2)
+        shape = (
+            f'<rect x="{x:.1f}" y="{y:.1f}" width="{w:.1f}" height="{h:.1f}" '
+            f'rx="{radius:.1f}" {style}/>'
+        )
+
+    if not node.members:
+        return shape + _text(cx, cy, node.label)
+
+    title_h = len(_lines(node.label)) * LINE_HEIGHT + 2 * PAD_Y
+    parts = [shape, _text(cx, y + title_h / 2, node.label, weight="bold")]
+    parts.append(
+        f'<line x1="{x:.1f}" y1="{y + title_h:.1f}" x2="{x + w:.1f}" '
+        f'y2="{y + title_h:.1f}" stroke="{STROKE}"/>'
+    )
+    for i, member in enumerate(node.members):
+        my = y + title_h + PAD_Y / 2 + (i + 0.5) * LINE_HEIGHT
+        parts.append(_text(x + PAD_X, my, member, anchor="start"))
+    return "".join(parts)
+
+
+def _edge_svg(edge: Edge, nodes: dict[str, Node]) -> str:
+    a, b = nodes[edge.src], nodes[edge.dst]
+    dash = ' stroke-dasharray="6 4"' if edge.style == "dotted" else ""
+    width = 3 if edge.style == "thick" else 1.5
+    end = f' marker-end="url(#{edge.head})"' if edge.head != "none" else ""
+    start = f' marker-start="url(#{edge.tail})"' if edge.tail != "none" else ""
+
+    if a is b:
+        x, y = a.x + a.w, a.y + a.h / 2
+        path = (
+            f'<path d="M{x:.1f},{y - 8:.1f} C{x + 40:.1f},{y - 30:.1f} '
+            f'{x + 40:.1f},{y + 30:.1f} {x:.1f},{y + 8:.1f}" fill="none" '
+            f'stroke="{STROKE}" stroke-width="{width}"{dash}{end}{start}/>'
+        )
+        label = _label_box(x + 40, y, edge.label) if edge.label else ""
+        return path + label
+
+    x1, y1 = _clip(a, b.x + b.w / 2, b.y + b.h / 2)
+    x2, y2 = _clip(b, a.x + a.w / 2, a.y + a.h / 2)
+    line = (
+        f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}" '
+        f'stroke="{STROKE}" stroke-width="{width}"{dash}{end}{start}/>'
+    )
+    label = _label_box((x1 + x2) / 2, (y1 + y2) / 2, edge.label) if edge.label else ""
+    return line + label
+
+
+def _graph_svg(nodes: dict[str, Node], edges: list[Edge], direction: str) -> str:
+    _place(nodes, _layers(nodes, edges), direction)
+    width = max(n.x + n.w for n in nodes.values()) + MARGIN
+    height = max(n.y + n.h for n in nodes.values()) + MARGIN
+    for e in edges:
+        if e.src == e.dst:
+            width = max(width, nodes[e.src].x + nodes[e.src].w + 60 + MARGIN)
+    body = [_edge_svg(e, nodes) for e in edges]
+    body += [_node_svg(n) for n in nodes.values()]
+    return _svg(width, height, body)
+
+
+def _statements(code: str) -> list[str]:
+    out = []
+    for line in code.splitlines():
+        line = line.split("%%", 1)[0].strip()
+        out.extend(s.strip() for s in line.split(";") if s.strip())
+    return out
+
+
+def _unquote(label: str) -> str:
+    label = label.strip()
+    if len(label) >= 2 and label[0] == label[-1] == '"':
+        label = label[1:-1]
+    return label
+
+
+# ---------------------------------------------------------------------------
+# Flowchart
+# ---------------------------------------------------------------------------
+
+_SHAPES = [
+    ("((", "))", "circle"),
+    ("([", "])", "stadium"),
+    ("[[", "]]", "rect"),
+    ("[(", ")]", "round"),
+    ("{{", "}}", "diamond"),
+    ("[/", "/]", "rect"),
+    ("[\\", "\\]", "rect"),
+    ("[", "]", "rect"),
+    ("(", ")", "round"),
+    ("{", "}", "diamond"),
+    (">", "]", "rect"),
+]
+_NODE_ID_RE = re.compile(r"\s*(\w+)")
+_QUOTED_RE = re.compile(r'\s*"[^"]*"')
+_EDGE_RE = re.compile(
+    r"\s*(?:"
+    r"--\s*(?P<l1>[^->|][^>|]*?)\s*(?P<o1>-->|---)"
+    r"|==\s*(?P<l2>[^=>|][^>|]*?)\s*(?P<o2>==>|===)"
+    r"|-\.\s*(?P<l3>[^.>|][^>|]*?)\s*(?P<o3>\.->|\.-)"
+    r"|(?P<op><-->|-->|---|-\.->|-\.-|==>|===|--[ox])"
+    r"(?:\s*\|(?P<pipe>[^|]*)\|)?"
+    r")\s*"
+)
+_IGNORED = (
+    "style ",
+    "classdef ",
+    "class ",
+    "linkstyle ",
+    "click ",
+    "direction ",
+)
+
+
+def _read_node(stmt: str, pos: int, nodes: dict[str, Node]) -> tuple[str, int] | None:
+    match = _NODE_ID_RE.match(stmt, pos)
+    if not match:
+        return None
+    node_id = match.group(1)
+    pos = match.end()
+    label, shape = None, "rect"
+    rest = stmt[pos:].lstrip()
+    for open_, close, kind in _SHAPES:
+        if rest.startswith(open_):
+            # A quoted label may contain the closing delimiter: A["list[int]"]
+            quoted = _QUOTED_RE.match(rest, len(open_))
+            end = rest.find(close, quoted.end() if quoted else len(open_))
+            if end != -1:
+                label = _unquote(rest[len(open_):end])
+                shape = kind
+                pos = len(stmt) - len(rest) + end + len(close)
+            break
+    node = nodes.setdefault(node_id, Node(id=node_id, label=node_id))
+    if label is not None:
+        node.label, node.shape = label, shape
+    return node_id, pos
+
+
+def _read_group(stmt: str, pos: int, nodes: dict[str, Node]) -> tuple[list[str], int]:
+    group = []
+    while True:
+        read = _read_node(stmt, pos, nodes)
+        if read is None:
+            break
+        node_id, pos = read
+        group.append(node_id)
+        amp = re.match(r"\s*&\s*", stmt[pos:])
+        if not amp:
+            break
+        pos += amp.end()
+    return group, pos
+
+
+def _edge_kind(op: str) -> tuple[str, str, str]:
+    style = "dotted" if "." in op else "thick" if "=" in op else "solid"
+    head = "arrow" if op.endswith(">") else "none"
+    tail = "arrow" if op.startswith("<") else "none"
+    return style, head, tail
+
+
+def _flowchart(lines: list[str], direction: str) -> str:
+    nodes: dict[str, Node] = {}
+    edges: list[Edge] = []
+    for stmt in lines:
+        lowered = stmt.lower()
+        if lowered.startswith("subgraph"):
+            continue
+        if lowered == "end" or lowered.startswith(_IGNORED):
+            continue
+        group, pos = _read_group(stmt, 0, nodes)
+        while group:
+            match = _EDGE_RE.match(stmt, pos)
+            if not match:
+                break
+            op = next(match.group(k) for k in ("o1", "o2", "o3", "op") if match.group(k))
+            label = next(
+                (match.group(k) for k in ("l1", "l2", "l3", "pipe") if match.group(k)),
+                "",
+            )
+            style, head, tail = _edge_kind(op)
+            targets, pos = _read_group(stmt, match.end(), nodes)
+            for src in group:
+                for dst in targets:
+                    edges.append(Edge(src, dst, _unquote(label), style, head, tail))
+            group = targets
+    if not nodes:
+        raise ValueError("flowchart has no nodes")
+    return _graph_svg(nodes, edges, direction)
+
+
+# ---------------------------------------------------------------------------
+# Class diagram
+# ---------------------------------------------------------------------------
+
+_RELATIONS = {
+    "<|--": ("solid", "none", "triangle"),
+    "--|>": ("solid", "triangle", "none"),
+    "<|..": ("dotted", "none", "triangle"),
+    "..|>": ("dotted", "triangle", "none"),
+    "*--": ("solid", "none", "filled_diamond"),
+    "--*": ("solid", "filled_diamond", "none"),
+    "o--": ("solid", "none", "diamond"),
+    "--o": ("solid", "diamond", "none"),
+    "<--": ("solid", "none", "open"),
+    "-->": ("solid", "open", "none"),
+    "<..": ("dotted", "none", "open"),
+    "..>": ("dotted", "open", "none"),
+    "--": ("solid", "none", "none"),
+    "..": ("dotted", "none", "none"),
+}
+_RELATION_RE = re.compile(
+    r'^([\w.~]+)\s*(?:"[^"]*"\s*)?('
+    + "|".join(re.escape(op) for op in sorted(_RELATIONS, key=len, reverse=True))
+    + r')\s*(?:"[^"]*"\s*)?([\w.~]+)\s*(?::\s*(.*))?$'
+)
+_CLASS_RE = re.compile(r"^class\s+([\w.~]+)\s*(?:\[\"?([^\]\"]*)\"?\])?\s*(\{)?\s*(\})?$")
+_MEMBER_RE = re.compile(r"^([\w.~]+)\s*:\s*(.+)$")
+
+
+def _class_diagram(lines: list[str]) -> str:
+    nodes: dict[str, Node] = {}
+    edges: list[Edge] = []
+
+    def get(name: str) -> Node:
+        return nodes.setdefault(name, Node(id=name, label=name.replace("~", "<", 1).replace("~", ">", 1)))
+
+    open_class = None
+    for stmt in lines:
+        if open_class is not None:
+            if stmt == "}":
+                open_class = None
+            else:
+                open_class.members.append(stmt)
+            continue
+        if stmt.startswith(("note", "direction", "style", "cssClass", "<<")):
+            continue
+        match = _CLASS_RE.match(stmt)
+        if match:
+            node = get(match.group(1))
+            if match.group(2):
+                node.label = match.group(2)
+            if match.group(3) and not match.group(4):
+                open_class = node
+            continue
+        match = _RELATION_RE.match(stmt)
+        if match:
+            src, op, dst, label = match.groups()
+            style, head, tail = _RELATIONS[op]
+            get(src), get(dst)
+            edges.append(Edge(src, dst, label or "", style, head, tail))
+            continue
+        match = _MEMBER_RE.match(stmt)
+        if match:
+            get(match.group(1)).members.append(match.group(2))
+    if not nodes:
+        raise ValueError("class diagram has no classes")
+    return _graph_svg(nodes, edges, "TD")
+
+
+# ---------------------------------------------------------------------------
+# Sequence diagram
+# ---------------------------------------------------------------------------
+
+_PARTICIPANT_RE = re.compile(r"^(?:participant|actor)\s+(\S+)(?:\s+as\s+(.+))?$", re.IGNORECASE)
+_MESSAGE_RE = re.compile(
+    r"^(.+?)\s*(-->>|->>|-->|->|--x|-x|--\)|-\))\s*[+-]?\s*([^:]+?)\s*(?::\s*(.*))?$"
+)
+_NOTE_RE = re.compile(
+    r"^note\s+(left of|right of|over)\s+([^:]+?)\s*:\s*(.*)$", re.IGNORECASE
+)
+_BLOCK_RE = re.compile(r"^(loop|alt|else|opt|par|and|critical|break|rect)\b\s*(.*)$", re.IGNORECASE)
+
+
+def _sequence(lines: list[str]) -> str:
+    participants: dict[str, str] = {}
+    events: list[tuple] = []
+
+    def ensure(name: str):
+        participants.setdefault(name, name)
+
+    for stmt in lines:
+        match = _PARTICIPANT_RE.match(stmt)
+        if match:
+            participants[match.group(1)] = _unquote(match.group(2) or match.group(1))
+            continue
+        match = _NOTE_RE.match(stmt)
+        if match:
+            where, who, text = match.groups()
+            names = [w.strip() for w in who.split(",")]
+            for name in names:
+                ensure(name)
+            events.append(("note", where.lower(), names, text))
+            continue
+        match = _BLOCK_RE.match(stmt)
+        if match:
+            events.append(("block", match.group(1).lower(), match.group(2)))
+            continue
+        match = _MESSAGE_RE.match(stmt)
+        if match:
+            src, op, dst, text = match.groups()
+            ensure(src)
+            ensure(dst)
+            events.append(("message", src, dst, op, text))
+    if not participants:
+        raise ValueError("sequence diagram has no participants")
+
+    names = list(participants)
+    box_w = {n: max(_text_width(participants[n]) + 2 * PAD_X, MIN_NODE_WIDTH) for n in names}
+    gap = [0.0] * len(names)
+    for event in events:
+        if event[0] == "message":
+            i, j = names.index(event[1]), names.index(event[2])
+            if i != j:
+                lo = min(i, j)
+                span = _text_width(event[4]) + 2 * PAD_X
+                gap[lo] = max(gap[lo], span / max(abs(i - j), 1))
+
+    centers: dict[str, float] = {}
+    for i, n in enumerate(names):
+        if i == 0:
+            centers[n] = MARGIN + box_w[n] / 2
+            continue
+        prev = names[i - 1]
+        step = max(box_w[prev] / 2 + NODE_GAP + box_w[n] / 2, gap[i - 1])
+        centers[n] = centers[prev] + step
+    width = centers[names[-1]] + box_w[names[-1]] / 2 + MARGIN
+
+    box_h = LINE_HEIGHT + 2 * PAD_Y
+    y = MARGIN + box_h + 30
+    body: list[str] = []
+    for event in events:
+        if event[0] == "message":
+            _, src, dst, op, text = event
+            text = text or ""
+            dash = ' stroke-dasharray="6 4"' if op.startswith("--") else ""
+            marker = "arrow" if op.endswith(">>") else "open"
+            x1, x2 = centers[src], centers[dst]
+            if src == dst:
+                body.append(
+                    f'<path d="M{x1:.1f},{y:.1f} h40 v24 h-40" fill="none" '
+                    f'stroke="{STROKE}" stroke-width="1.5"{dash} marker-end="url(#{marker})"/>'
+                )
+                if text:
+                    body.append(_text(x1 + 48, y + 12, text, anchor="start"))
+                    width = max(width, x1 + 48 + _text_width(text) + MARGIN)
+                y += 44
+                continue
+            if text:
+                body.append(_text((x1 + x2) / 2, y - 10, text))
+            body.append(
+                f'<line x1="{x1:.1f}" y1="{y:.1f}" x2="{x2:.1f}" y2="{y:.1f}" '
+                f'stroke="{STROKE}" stroke-width="1.5"{dash} marker-end="url(#{marker})"/>'
+            )
+            y += 40
+        elif event[0] == "note":
+            _, where, who, text = event
+            w = _text_width(text) + 2 * PAD_X
+            h = len(_lines(text)) * LINE_HEIGHT + PAD_Y
+            if where == "over":
+                xs = [centers[n] for n in who]
+                cx = (min(xs) + max(xs)) / 2
+                w = max(w, max(xs) - min(xs) + 40)
+            elif where == "left of":
+                cx = centers[who[0]] - w / 2 - 12
+            else:
+                cx = centers[who[0]] + w / 2 + 12
+            width = max(width, cx + w / 2 + MARGIN)
+            body.append(
+                f'<rect x="{cx - w / 2:.1f}" y="{y - 14:.1f}" width="{w:.1f}" '
+                f'height="{h:.1f}" fill="{NOTE_FILL}" stroke="{STROKE}"/>'
+            )
+            body.append(_text(cx, y - 14 + h / 2, text))
+            y += h + 16
+        elif event[0] == "block" and event[1] not in ("rect",):
+            label = f"[{event[1]}] {event[2]}".strip()
+            body.append(_text(MARGIN, y - 6, label, anchor="start", weight="bold"))
+            y += 24
+
+    bottom = y + 6
+    head: list[str] = []
+    for n in names:
+        cx = centers[n]
+        head.append(
+            f'<line x1="{cx:.1f}" y1="{MARGIN + box_h:.1f}" x2="{cx:.1f}" '
+            f'y2="{bottom:.1f}" stroke="#999999" stroke-dasharray="4 4"/>'
+        )
+        for top in (MARGIN, bottom):
+            head.append(
+                f'<rect x="{cx - box_w[n] / 2:.1f}" y="{top:.1f}" width="{box_w[n]:.1f}" '
+                f'height="{box_h:.1f}" rx="3" fill="{FILL}" stroke="{STROKE}" stroke-width="1.5"/>'
+            )
+            head.append(_text(cx, top + box_h / 2, participants[n]))
+    return _svg(width, bottom + box_h + MARGIN, head + body)
+
+
+# ---------------------------------------------------------------------------
+# Entry points
+# ---------------------------------------------------------------------------
+
+
+def render_svg(code: str) -> str:
+    """Render Mermaid source to an SVG document. Raises ValueError on
+    diagram types outside the supported subset."""
+    lines = _statements(code)
+    if not lines:
+        raise ValueError("empty diagram")
+    header, body = lines[0].split(), lines[1:]
+    kind = header[0].lower()
+    if kind in ("graph", "flowchart"):
+        direction = header[1].upper() if len(header) > 1 else "TD"
+        return _flowchart(body, "TD" if direction == "TB" else direction)
+    if kind == "sequencediagram":
+        return _sequence(body)
+    if kind == "classdiagram":
+        return _class_diagram(body)
+    raise ValueError(f"unsupported diagram type: {header[0]}")
+
+
+def render_file(code: str, path: str) -> None:
+    """Render Mermaid source into an SVG file (picklable for process pools)."""
+    svg = render_svg(code)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(svg)
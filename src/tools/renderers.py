@@ -0,0 +1,125 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Protocol
+
+from loguru import logger
+from src.config import config
+from src.tools.image import get_excalidraw_pool, get_tool_by_name
+from src.tools.mermaid import render_file
+from src.tracing import span
+
+MIN_IMAGE_BYTES = 5_000
+
+
+class Renderer(Protocol):
+    """Turns cleaned Mermaid source into an image file at ``image_path``."""
+
+    name: str
+    format: str
+
+    async def render(self, title: str, mermaid_code: str, image_path: Path) -> bool: ...
+
+
+async def _render_on_canvas(tools, title: str, mermaid_code: str, image_path: Path) -> bool:
+    clear = get_tool_by_name(tools, "clear_canvas")
+    create = get_tool_by_name(tools, "create_from_mermaid")
+    export = get_tool_by_name(tools, "export_to_image")
+
+    try:
+        with span(clear.name, "tool", diagram=title):
+            await clear.ainvoke({})
+        with span(create.name, "tool", diagram=title):
+            await create.ainvoke({"mermaidDiagram": mermaid_code})
+        with span(export.name, "tool", diagram=title):
+            await export.ainvoke({"format": "png", "filePath": str(image_path)})
+    except Exception as e:
+        logger.warning(f"MCP tool failed for '{title}': {e}, skipping.")
+        return False
+
+    if not image_path.exists():
+        logger.warning(f"Export did not create file at {image_path}, skipping.")
+        return False
+
+    if image_path.stat().st_size < MIN_IMAGE_BYTES:
+        logger.warning(
+            f"Blank image detected for '{title}' "
+            f"({image_path.stat().st_size} bytes), skipping."
+        )
+        image_path.unlink()
+        return False
+
+    return True
+
+
+class ExcalidrawRenderer:
+    """Renders through the Excalidraw MCP server pool and exports PNG."""
+
+    name = "excalidraw"
+    format = "png"
+
+    async def render(self, title: str, mermaid_code: str, image_path: Path) -> bool:
+        pool = get_excalidraw_pool()
+        with span("render", "render", renderer=self.name, diagram=title):
+            rendered = await pool.run(
+                partial(
+                    _render_on_canvas,
+                    title=title,
+                    mermaid_code=mermaid_code,
+                    image_path=image_path,
+                )
+            )
+        stats = pool.stats()
+        logger.debug(
+            f"Renderer pool: {stats['jobs']} jobs, avg wait {stats['avg_wait']:.2f}s, "
+            f"max wait {stats['max_wait']:.2f}s, {stats['restarts']} restarts"
+        )
+        return rendered
+
+
+class LocalRenderer:
+    """Lays out the supported Mermaid subset in-process and writes SVG.
+    Rendering runs in a process pool so it never blocks the event loop."""
+
+    name = "local"
+    format = "svg"
+
+    def __init__(self):
+        self._executor: ProcessPoolExecutor | None = None
+
+    async def render(self, title: str, mermaid_code: str, image_path: Path) -> bool:
+        if self._executor is None:
+            # Spawned, not forked: by now the process runs the MCP pool,
+            # speculative research and SQLite threads, whose locks a fork
+            # could copy mid-acquisition.
+            self._executor = ProcessPoolExecutor(
+                max_workers=config.DIAGRAM_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        loop = asyncio.get_running_loop()
+        try:
+            with span("render", "render", renderer=self.name, diagram=title):
+                await loop.run_in_executor(
+                    self._executor, render_file, mermaid_code, str(image_path)
+                )
+        except ValueError as e:
+            logger.warning(f"Local renderer failed for '{title}': {e}, skipping.")
+            return False
+        return True
+
+
+RENDERERS = {"excalidraw": ExcalidrawRenderer, "local": LocalRenderer}
+_instances: dict[str, Renderer] = {}
+
+
+def get_renderer(name: str | None = None) -> Renderer:
+    name = name or config.DIAGRAM_RENDERER
+    if name not in RENDERERS:
+        raise ValueError(
+            f"Unknown diagram renderer '{name}', expected one of {sorted(RENDERERS)}"
+        )
+    if name not in _instances:
+        _instances[name] = RENDERERS[name]()
+    return _instances[name]
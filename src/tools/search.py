@@ -1,16 +1,91 @@
-from langchain_core.tools import tool
+import asyncio
+import re
+import threading
+import weakref
+
+import httpx
+from langchain_core.tools import StructuredTool
+from src.cache import SQLiteCache
 from src.config import config
+from src.ratelimit import AdaptiveLimiter, Outcome
+from src.tracing import annotate, span
 from tavily import TavilyClient
 
 client = TavilyClient(api_key=config.TAVILY_API_KEY)
 
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+MAX_RESULTS = 5
+_WS_RE = re.compile(r"\s+")
 
-@tool
-def web_search(query: str) -> str:
-    """Search the web for current information about a topic.
-    Use this to find recent articles, documentation, and technical resources.
-    Returns titles, URLs, and content summaries."""
-    results = client.search(query=query, max_results=5)
+_cache: SQLiteCache | None = None
+_cache_lock = threading.Lock()
+_limiter: AdaptiveLimiter | None = None
+
+# httpx pools are bound to the loop that opened them, so keep one per loop.
+_async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    if loop not in _async_clients:
+        _async_clients[loop] = httpx.AsyncClient(
+            headers={"Authorization": f"Bearer {config.TAVILY_API_KEY}"},
+            timeout=60,
+        )
+    return _async_clients[loop]
+
+
+async def _tavily_search(query: str) -> dict:
+    response = await _get_async_client().post(
+        TAVILY_SEARCH_URL, json={"query": query, "max_results": MAX_RESULTS}
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def _classify(error: BaseException) -> Outcome:
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        if status == 429:
+            return "throttled"
+        return "transient" if status >= 500 else None
+    return "transient" if isinstance(error, httpx.TransportError) else None
+
+
+def get_search_limiter() -> AdaptiveLimiter:
+    """Return the process-wide limiter Tavily requests are admitted through."""
+    global _limiter
+    with _cache_lock:
+        if _limiter is None:
+            _limiter = AdaptiveLimiter(
+                "Search",
+                max_concurrency=config.SEARCH_MAX_CONCURRENCY,
+                rpm=config.SEARCH_RPM,
+                classify=_classify,
+                latency_spike=config.RATE_LIMIT_LATENCY_SPIKE,
+            )
+        return _limiter
+
+
+def get_search_cache() -> SQLiteCache | None:
+    """Return the on-disk search cache, or None when SEARCH_CACHE_PATH is unset."""
+    global _cache
+    if config.SEARCH_CACHE_PATH and _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SQLiteCache(
+                    config.SEARCH_CACHE_PATH,
+                    config.SEARCH_CACHE_MAX_MB * 1024 * 1024,
+                    ttl=config.SEARCH_CACHE_TTL,
+                )
+    return _cache
+
+
+def normalize_query(query: str) -> str:
+    return _WS_RE.sub(" ", query.lower()).strip(" \t\"'.?!")
+
+
+def _format(results: dict) -> str:
     formatted = []
     for r in results["results"]:
         formatted.append(
@@ -19,3 +94,63 @@ def web_search(query: str) -> str:
             f"Content: {r['content']}"
         )
     return "\n\n---\n\n".join(formatted)
+
+
+def _cache_key(query: str) -> str:
+    return f"{MAX_RESULTS}:{normalize_query(query)}"
+
+
+def _cached(key: str) -> str | None:
+    cache = get_search_cache()
+    if cache is None:
+        return None
+    cached = cache.get(key)
+    return cached.decode() if cached is not None else None
+
+
+def _remember(key: str, formatted: str) -> None:
+    cache = get_search_cache()
+    if cache is not None:
+        cache.set(key, formatted.encode())
+
+
+def _web_search(query: str) -> str:
+    """Search the web for current information about a topic.
+    Use this to find recent articles, documentation, and technical resources.
+    Returns titles, URLs, and content summaries."""
+    with span("web_search", "tool", query=query):
+        key = _cache_key(query)
+        cached = _cached(key)
+        annotate(cached=cached is not None)
+        if cached is not None:
+            return cached
+
+        results, queued = get_search_limiter().call_blocking(
+            lambda: client.search(query=query, max_results=MAX_RESULTS)
+        )
+        annotate(queue_wait=queued)
+        formatted = _format(results)
+        _remember(key, formatted)
+        return formatted
+
+
+async def _aweb_search(query: str) -> str:
+    with span("web_search", "tool", query=query):
+        key = _cache_key(query)
+        cached = _cached(key)
+        annotate(cached=cached is not None)
+        if cached is not None:
+            return cached
+
+        results, queued = await get_search_limiter().call(
+            lambda: _tavily_search(query)
+        )
+        annotate(queue_wait=queued)
+        formatted = _format(results)
+        _remember(key, formatted)
+        return formatted
+
+
+web_search = StructuredTool.from_function(
+    func=_web_search, coroutine=_aweb_search, name="web_search"
+)
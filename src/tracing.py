@@ -0,0 +1,228 @@
+import asyncio
+import functools
+import itertools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables.config import var_child_runnable_config
+
+
+@dataclass
+class Span:
+    id: int
+    name: str
+    category: str
+    start: float
+    parent: int | None = None
+    node: str | None = None
+    end: float | None = None
+    attrs: dict = field(default_factory=dict)
+
+
+_tracer: ContextVar["Tracer | None"] = ContextVar("tracer", default=None)
+_current: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class Tracer(BaseCallbackHandler):
+    """Collects spans for one run.
+
+    Graph nodes are picked up through LangChain callbacks (pass the tracer in
+    the run config's ``callbacks``); LLM, search and MCP calls open their own
+    spans with :func:`span`, parented to the enclosing span or graph node.
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self.spans: list[Span] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        # Every callback run -> id of the nearest traced span at or above it.
+        self._runs: dict[UUID, int | None] = {}
+        self._open: dict[UUID, Span] = {}
+        self._by_id: dict[int, Span] = {}
+
+    def start(
+        self, name: str, category: str, parent: int | None, node: str | None, **attrs
+    ) -> Span:
+        with self._lock:
+            span = Span(
+                id=next(self._ids),
+                name=name,
+                category=category,
+                start=time.perf_counter(),
+                parent=parent,
+                node=node,
+                attrs=attrs,
+            )
+            self.spans.append(span)
+            self._by_id[span.id] = span
+        return span
+
+    def on_chain_start(
+        self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, **kwargs
+    ):
+        node = (metadata or {}).get("langgraph_node")
+        name = kwargs.get("name")
+        is_node = node and name == node and not node.startswith("__")
+        if parent_run_id is None or is_node:
+            category = "node" if parent_run_id else "graph"
+            parent = self._runs.get(parent_run_id) if parent_run_id else None
+            span = self.start(name or category, category, parent, node)
+            self._open[run_id] = span
+            self._runs[run_id] = span.id
+        else:
+            self._link(run_id, parent_run_id)
+
+    # Model and tool runs get their spans from the code that makes the call;
+    # they are only linked so spans opened inside them find their node.
+    def on_chat_model_start(
+        self, serialized, messages, *, run_id, parent_run_id=None, **kwargs
+    ):
+        self._link(run_id, parent_run_id)
+
+    def on_llm_start(
+        self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs
+    ):
+        self._link(run_id, parent_run_id)
+
+    def on_tool_start(
+        self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs
+    ):
+        self._link(run_id, parent_run_id)
+
+    def _link(self, run_id: UUID, parent_run_id: UUID | None):
+        self._runs[run_id] = self._runs.get(parent_run_id) if parent_run_id else None
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, error=repr(error))
+
+    def _finish(self, run_id: UUID, **attrs):
+        span = self._open.pop(run_id, None)
+        if span is not None:
+            span.end = time.perf_counter()
+            span.attrs.update(attrs)
+
+    def enclosing_node(self) -> Span | None:
+        """The graph node span the current code runs under, if any."""
+        config = var_child_runnable_config.get() or {}
+        run_id = getattr(config.get("callbacks"), "parent_run_id", None)
+        span_id = self._runs.get(run_id) if run_id else None
+        return self._by_id.get(span_id) if span_id else None
+
+    def chrome_trace(self) -> dict:
+        """Spans as Chrome trace events, one lane per concurrent branch so
+        fan-out shows up side by side in chrome://tracing or Perfetto."""
+        origin = min((s.start for s in self.spans), default=0.0)
+        lanes: list[list[Span]] = []
+        lane_of: dict[int, int] = {}
+
+        def fits(lane: list[Span], span: Span, end: float) -> bool:
+            while lane and (lane[-1].end or lane[-1].start) <= span.start:
+                lane.pop()
+            return not lane or (lane[-1].end or end) >= end
+
+        events = []
+        for span in sorted(self.spans, key=lambda s: s.start):
+            end = span.end or span.start
+            preferred = lane_of.get(span.parent)
+            order = [preferred] if preferred is not None else []
+            order += range(len(lanes))
+            lane = next((i for i in order if fits(lanes[i], span, end)), None)
+            if lane is None:
+                lanes.append([])
+                lane = len(lanes) - 1
+            lanes[lane].append(span)
+            lane_of[span.id] = lane
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": (span.start - origin) * 1e6,
+                    "dur": (end - span.start) * 1e6,
+                    "pid": 1,
+                    "tid": lane,
+                    "args": {
+                        "id": span.id,
+                        "parent": span.parent,
+                        "node": span.node,
+                        **span.attrs,
+                    },
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: str | Path):
+        Path(path).write_text(json.dumps(self.chrome_trace()), encoding="utf-8")
+
+
+def activate(tracer: Tracer | None):
+    """Record spans into ``tracer`` from this context (and tasks it starts)."""
+    _tracer.set(tracer)
+
+
+@contextmanager
+def span(name: str, category: str, **attrs):
+    """Open a span under the current one; a no-op unless a tracer is active."""
+    tracer = _tracer.get()
+    if tracer is None:
+        yield None
+        return
+    parent = _current.get() or tracer.enclosing_node()
+    current = tracer.start(
+        name,
+        category,
+        parent.id if parent else None,
+        parent.node if parent else None,
+        **attrs,
+    )
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.attrs["error"] = repr(e)
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _current.reset(token)
+
+
+def annotate(**attrs):
+    """Attach attributes (e.g. token counts) to the innermost open span."""
+    current = _current.get()
+    if current is not None:
+        current.attrs.update(attrs)
+
+
+def traced(name: str, category: str):
+    """Decorator form of :func:`span` for sync and async functions."""
+
+    def decorate(fn):
+        if asyncio.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name, category):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, category):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
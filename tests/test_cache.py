@@ -0,0 +1,61 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from src.cache import SQLiteCache
+
+
+class SQLiteCacheTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = str(Path(directory.name) / "cache.db")
+
+    def cache(self, **kwargs) -> SQLiteCache:
+        cache = SQLiteCache(self.path, **{"max_bytes": 1_000, **kwargs})
+        self.addCleanup(cache._conn.close)
+        return cache
+
+    def test_hits_do_not_write(self):
+        cache = self.cache()
+        cache.set("a", b"value")
+        writes = cache._conn.total_changes
+
+        self.assertEqual(cache.get("a"), b"value")
+        self.assertIsNone(cache.get("b"))
+
+        self.assertEqual(cache._conn.total_changes, writes)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_eviction_sees_batched_access_times(self):
+        cache = self.cache(max_bytes=10)
+        cache.set("old", b"1234")
+        cache.set("new", b"1234")
+        cache.get("old")
+
+        cache.set("third", b"1234")
+
+        self.assertEqual(cache.get("old"), b"1234")
+        self.assertIsNone(cache.get("new"))
+
+    def test_access_times_are_written_in_batches(self):
+        cache = self.cache(max_bytes=10_000)
+        keys = [str(i) for i in range(SQLiteCache.ACCESS_BATCH)]
+        for key in keys:
+            cache.set(key, b"1")
+        writes = cache._conn.total_changes
+
+        for key in keys:
+            cache.get(key)
+
+        self.assertEqual(cache._conn.total_changes - writes, len(keys))
+
+    def test_expired_entries_miss_until_replaced(self):
+        cache = self.cache(ttl=0.05)
+        cache.set("a", b"stale")
+        time.sleep(0.1)
+
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", b"fresh")
+        self.assertEqual(cache.get("a"), b"fresh")
@@ -0,0 +1,36 @@
+import unittest
+from unittest import mock
+
+from src.config import config
+
+# src.tools.search builds its Tavily client on import; these tests never search.
+with mock.patch.object(config, "TAVILY_API_KEY", config.TAVILY_API_KEY or "unused"):
+    from src.graph import build_graph
+
+
+def edges(mode: str) -> set[tuple[str, str]]:
+    """Fixed and conditional edges of the graph as built."""
+    builder = build_graph(mode).builder
+    routed = {
+        (source, target)
+        for source, branches in builder.branches.items()
+        for branch in branches.values()
+        for target in branch.ends or {}
+    }
+    return builder.edges | routed
+
+
+class BuildGraphTest(unittest.TestCase):
+    def test_pipeline_sends_sections_straight_from_the_approved_plan(self):
+        graph = edges("pipeline")
+        self.assertIn(("pre_research", "section_pipeline"), graph)
+        self.assertNotIn("search_planner", build_graph("pipeline").builder.nodes)
+
+    def test_staged_plans_searches_before_research(self):
+        graph = edges("staged")
+        self.assertIn(("pre_research", "search_planner"), graph)
+        self.assertIn(("search_planner", "researcher"), graph)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            build_graph("parallel")
@@ -0,0 +1,86 @@
+import asyncio
+import contextlib
+import unittest
+from unittest import mock
+
+from src.config import config
+from src.tools import image
+from src.tools.image import ExcalidrawPool
+
+
+class FakeSession:
+    async def send_ping(self):
+        pass
+
+
+class FakeClient:
+    """Counts the MCP sessions opened and closed by the pool."""
+
+    opened = 0
+    closed = 0
+
+    def __init__(self, connections):
+        pass
+
+    @contextlib.asynccontextmanager
+    async def session(self, name):
+        FakeClient.opened += 1
+        try:
+            yield FakeSession()
+        finally:
+            FakeClient.closed += 1
+
+
+async def load_tools(session):
+    return []
+
+
+def shut_down(pool: ExcalidrawPool):
+    async def cancel_members():
+        for task in asyncio.all_tasks():
+            if task is not asyncio.current_task():
+                task.cancel()
+
+    asyncio.run_coroutine_threadsafe(cancel_members(), pool._loop).result()
+    pool._loop.call_soon_threadsafe(pool._loop.stop)
+
+
+class ExcalidrawPoolTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        FakeClient.opened = FakeClient.closed = 0
+        for patch in (
+            mock.patch.object(image, "MultiServerMCPClient", FakeClient),
+            mock.patch.object(image, "load_mcp_tools", load_tools),
+            mock.patch.object(image, "RESTART_BACKOFF", 0),
+            mock.patch.object(config, "EXCALIDRAW_TIMEOUT", 0.2),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def test_hung_job_restarts_the_session(self):
+        pool = ExcalidrawPool(["http://canvas"])
+        self.addCleanup(shut_down, pool)
+
+        async def hang(tools):
+            await asyncio.Event().wait()
+
+        async def render(tools):
+            return "rendered"
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await pool.run(hang)
+        self.assertEqual(await pool.run(render), "rendered")
+        self.assertEqual(pool.restarts, 1)
+        self.assertEqual((FakeClient.opened, FakeClient.closed), (2, 1))
+
+    async def test_job_errors_keep_the_session(self):
+        pool = ExcalidrawPool(["http://canvas"])
+        self.addCleanup(shut_down, pool)
+
+        async def fail(tools):
+            raise ValueError("bad diagram")
+
+        with self.assertRaises(ValueError):
+            await pool.run(fail)
+        self.assertEqual(pool.restarts, 0)
+        self.assertEqual(FakeClient.opened, 1)
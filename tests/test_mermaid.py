@@ -0,0 +1,62 @@
+import unittest
+import xml.etree.ElementTree as ET
+
+from src.tools.mermaid import render_svg
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def texts(svg: str) -> list[str]:
+    """The text lines of a rendered diagram, checking that it parses."""
+    root = ET.fromstring(svg)
+    return ["".join(span.itertext()) for span in root.iter(f"{SVG}tspan")]
+
+
+class FlowchartTest(unittest.TestCase):
+    def test_nodes_and_edge_labels(self):
+        svg = render_svg(
+            "flowchart LR\n  A[Producer] -->|publish| B((Broker))\n  B -.-> C{Consumer}"
+        )
+        self.assertEqual(
+            sorted(texts(svg)), ["Broker", "Consumer", "Producer", "publish"]
+        )
+
+    def test_quoted_labels_may_contain_the_closing_delimiter(self):
+        svg = render_svg(
+            'graph TD\n  A["list[int]"] --> B("f(x)")\n  B --> C{"{key: value}"}'
+        )
+        self.assertEqual(sorted(texts(svg)), ["f(x)", "list[int]", "{key: value}"])
+
+    def test_chains_groups_and_line_breaks(self):
+        svg = render_svg("graph TD\n  A & B --> C[one<br/>two] --> D")
+        self.assertEqual(sorted(texts(svg)), ["A", "B", "D", "one", "two"])
+
+    def test_markup_in_labels_is_escaped(self):
+        svg = render_svg('graph TD\n  A["a < b & c"] --> B')
+        self.assertIn("a < b & c", texts(svg))
+
+
+class DiagramTypesTest(unittest.TestCase):
+    def test_sequence_diagram(self):
+        svg = render_svg(
+            "sequenceDiagram\n"
+            "  participant C as Client\n"
+            "  C->>S: request\n"
+            "  S-->>C: response"
+        )
+        self.assertTrue({"Client", "S", "request", "response"} <= set(texts(svg)))
+
+    def test_class_diagram(self):
+        svg = render_svg(
+            "classDiagram\n"
+            "  class Broker {\n"
+            "    +publish(msg)\n"
+            "  }\n"
+            "  Broker <|-- Kafka"
+        )
+        self.assertTrue({"Broker", "Kafka", "+publish(msg)"} <= set(texts(svg)))
+
+    def test_unsupported_and_empty_diagrams_raise(self):
+        for code in ("pie\n  \"a\": 1", "", "%% only a comment", "graph TD"):
+            with self.subTest(code=code), self.assertRaises(ValueError):
+                render_svg(code)
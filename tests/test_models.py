@@ -0,0 +1,20 @@
+import unittest
+
+from src.models import ResearchResult, Section, merge_research, merge_sections
+
+
+class MergeByTest(unittest.TestCase):
+    def test_rewritten_section_replaces_the_original_in_place(self):
+        existing = [Section(title="A", content="a"), Section(title="B", content="b")]
+        new = [Section(title="A", content="a2"), Section(title="C", content="c")]
+
+        merged = merge_sections(existing, new)
+
+        self.assertEqual([s.title for s in merged], ["A", "B", "C"])
+        self.assertEqual(merged[0].content, "a2")
+
+    def test_retried_research_does_not_pile_up(self):
+        first = ResearchResult(section_title="A", sources=["1"], key_findings=[])
+        retry = ResearchResult(section_title="A", sources=["2"], key_findings=[])
+
+        self.assertEqual(merge_research([first], [retry]), [retry])
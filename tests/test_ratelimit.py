@@ -0,0 +1,138 @@
+import asyncio
+import time
+import unittest
+
+from src.ratelimit import AdaptiveLimiter, TokenBucket
+
+
+class CancellationTest(unittest.IsolatedAsyncioTestCase):
+    async def test_cancelled_waiter_gives_up_its_place(self):
+        limiter = AdaptiveLimiter("test", max_concurrency=1)
+        held = await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        self.assertEqual(limiter.stats()["waiting"], 1)
+
+        waiter.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+        limiter.release(held)
+
+        self.assertEqual(limiter.stats()["in_flight"], 0)
+        await asyncio.wait_for(limiter.acquire(), timeout=1)
+
+    async def test_waiter_cancelled_after_its_wakeup_releases_the_slot(self):
+        limiter = AdaptiveLimiter("test", max_concurrency=1)
+        held = await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        # The release hands the slot to the waiter before its task resumes.
+        limiter.release(held)
+        self.assertEqual(limiter.stats()["in_flight"], 1)
+        waiter.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+
+        self.assertEqual(limiter.stats()["in_flight"], 0)
+        await asyncio.wait_for(limiter.acquire(), timeout=1)
+
+
+class LimitTest(unittest.TestCase):
+    def test_throttling_halves_the_limit_once_per_generation(self):
+        limiter = AdaptiveLimiter("test", max_concurrency=8)
+        permits = [limiter.acquire_blocking() for _ in range(4)]
+
+        for permit in permits:
+            limiter.release(permit, throttled=True)
+        self.assertEqual(limiter.limit, 4)
+        self.assertEqual(limiter.stats()["throttled"], 4)
+
+        # A call admitted after the cut saw the new limit.
+        limiter.release(limiter.acquire_blocking(), throttled=True)
+        self.assertEqual(limiter.limit, 2)
+
+    def test_limit_never_drops_below_one(self):
+        limiter = AdaptiveLimiter("test", max_concurrency=2)
+        for _ in range(3):
+            limiter.release(limiter.acquire_blocking(), throttled=True)
+        self.assertEqual(limiter.limit, 1)
+
+    def test_limit_grows_only_while_saturated(self):
+        limiter = AdaptiveLimiter("test", max_concurrency=8)
+        limiter.release(limiter.acquire_blocking(), throttled=True)
+        self.assertEqual(limiter.limit, 4)
+
+        limiter.release(limiter.acquire_blocking())
+        self.assertEqual(limiter.limit, 4)
+
+        permits = [limiter.acquire_blocking() for _ in range(4)]
+        limiter.release(permits.pop())
+        self.assertEqual(limiter.limit, 4.25)
+
+    def test_limit_grows_no_further_than_max_concurrency(self):
+        limiter = AdaptiveLimiter("test", max_concurrency=2)
+        for _ in range(5):
+            permits = [limiter.acquire_blocking() for _ in range(2)]
+            for permit in permits:
+                limiter.release(permit)
+        self.assertEqual(limiter.limit, 2)
+
+    def test_failures_leave_the_limit_alone(self):
+        limiter = AdaptiveLimiter("test", max_concurrency=4)
+        limiter.release(limiter.acquire_blocking(), failed=True)
+        self.assertEqual(limiter.limit, 4)
+        self.assertEqual(limiter.stats()["in_flight"], 0)
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_overdraft_is_the_wait(self):
+        bucket = TokenBucket(per_minute=60)
+        self.assertEqual(bucket.take(60), 0)
+        self.assertAlmostEqual(bucket.take(2), 2, places=1)
+
+    def test_refund_is_capped_at_a_minutes_worth(self):
+        bucket = TokenBucket(per_minute=60)
+        bucket.take(10)
+        bucket.refund(100)
+        self.assertEqual(bucket.level, 60)
+
+
+class QuotaTest(unittest.IsolatedAsyncioTestCase):
+    async def test_requests_past_the_rpm_quota_wait(self):
+        limiter = AdaptiveLimiter("test", max_concurrency=1, rpm=120)
+        for _ in range(120):
+            limiter.release(await limiter.acquire())
+
+        permit = await limiter.acquire()
+
+        self.assertGreater(permit.queue_wait, 0.4)
+
+    async def test_tokens_past_the_tpm_quota_wait(self):
+        limiter = AdaptiveLimiter("test", max_concurrency=1, tpm=600)
+        limiter.release(await limiter.acquire(tokens=600))
+
+        permit = await limiter.acquire(tokens=5)
+
+        self.assertGreater(permit.queue_wait, 0.4)
+
+    async def test_unused_tokens_are_refunded(self):
+        limiter = AdaptiveLimiter("test", max_concurrency=1, tpm=600)
+        limiter.release(await limiter.acquire(tokens=600), used_tokens=0)
+
+        permit = await limiter.acquire(tokens=300)
+
+        self.assertLess(permit.queue_wait, 0.1)
+
+    async def test_queue_wait_counts_towards_the_quota_wait(self):
+        limiter = AdaptiveLimiter("test", max_concurrency=1, tpm=600)
+        held = await limiter.acquire(tokens=600)
+        start = time.monotonic()
+        waiter = asyncio.create_task(limiter.acquire(tokens=3))
+
+        # Queued for the slot as long as the quota makes it wait anyway.
+        await asyncio.sleep(0.3)
+        limiter.release(held)
+        await waiter
+
+        self.assertLess(time.monotonic() - start, 0.45)
@@ -0,0 +1,64 @@
+import unittest
+from unittest import mock
+
+from langchain_core.messages import AIMessage
+from src.config import config
+from src.models import Section, SectionEdit
+from src.nodes.rewriter import apply_edits, rewriter
+
+
+class ApplyEditsTest(unittest.TestCase):
+    def test_applies_edits_in_order(self):
+        edits = [
+            SectionEdit(find="Kafka is slow.", replace="Kafka is fast."),
+            SectionEdit(find="fast.", replace="fast enough."),
+        ]
+        self.assertEqual(
+            apply_edits("Intro. Kafka is slow.", edits), "Intro. Kafka is fast enough."
+        )
+
+    def test_no_edits(self):
+        self.assertIsNone(apply_edits("Intro.", []))
+
+    def test_missing_find(self):
+        edits = [SectionEdit(find="absent", replace="x")]
+        self.assertIsNone(apply_edits("Intro.", edits))
+
+    def test_ambiguous_find(self):
+        edits = [SectionEdit(find="the", replace="a")]
+        self.assertIsNone(apply_edits("the broker and the consumer", edits))
+
+    def test_empty_find(self):
+        edits = [SectionEdit(find="", replace="x")]
+        self.assertIsNone(apply_edits("Intro.", edits))
+
+
+class UnparsedPatchLLM:
+    """Fails to parse the patch, like a structured call with include_raw."""
+
+    usage = {}
+
+    def __init__(self, node_name: str):
+        pass
+
+    async def ainvoke_structured(self, messages, schema):
+        return None
+
+    async def ainvoke(self, messages, metadata=None):
+        return AIMessage(content="Rewritten.")
+
+
+class RewriterTest(unittest.IsolatedAsyncioTestCase):
+    async def test_unparsed_patch_falls_back_to_a_full_rewrite(self):
+        payload = {
+            "blog_context": "",
+            "section": Section(title="A", content="Original."),
+            "feedback": "Be clearer.",
+        }
+        with (
+            mock.patch.object(config, "REWRITER_PATCH", True),
+            mock.patch("src.nodes.rewriter.LLM", UnparsedPatchLLM),
+        ):
+            result = await rewriter(payload)
+
+        self.assertEqual(result["sections"], [Section(title="A", content="Rewritten.")])
@@ -13,7 +13,11 @@ import time
 import pandas as pd
 from collections import defaultdict
 
+from src.config import config as app_config
 from src.graph import build_graph
+from src.models import total_usage
+from src.streaming import draft_token
+from src.tools.renderers import RENDERERS
 from langgraph.types import Command
 from ui.styles import PROGRESS_CSS, PAGE_CSS
 
@@ -39,6 +43,16 @@ def run_async(coro):
     return _get_loop().run_until_complete(coro)
 
 
+def new_graph():
+    """Build the graph on the persistent loop; a SQLite checkpointer binds to
+    the loop it is created on."""
+
+    async def _build():
+        return build_graph()
+
+    return run_async(_build())
+
+
 # ---------------------------------------------------------------------------
 # Pipeline stages
 # ---------------------------------------------------------------------------
@@ -48,14 +62,23 @@ STAGES = [
     {"label": "Reviewing plan", "nodes": {"plan_review"}},
     {
         "label": "Researching sections",
-        "nodes": {"pre_research", "researcher", "research_done"},
+        "nodes": {
+            "pre_research",
+            "search_planner",
+            "researcher",
+            "research_done",
+        },
     },
-    {"label": "Writing sections", "nodes": {"worker"}},
+    {"label": "Writing sections", "nodes": {"worker", "section_pipeline"}},
     {"label": "Generating diagrams", "nodes": {"image_generator"}},
     {"label": "Assembling blog", "nodes": {"reducer"}},
     {"label": "Evaluating quality", "nodes": {"evaluator", "rewriter"}},
 ]
 
+# Minimum seconds between redraws of a streaming draft; each token would
+# otherwise trigger a full markdown re-render.
+DRAFT_REFRESH = 0.15
+
 IMAGE_PATTERN = re.compile(r"!\[([^\]]*)\]\(([^)]+)\)")
 
 
@@ -101,7 +124,7 @@ DEFAULTS = {
     "active_stage": None,
     "stage_details": {},
     "final_blog": "",
-    "token_usage": [],
+    "token_usage": {},
     "resume_value": None,
     "error": None,
     "generation_time": 0.0,
@@ -216,32 +239,32 @@ def render_plan_details(plan):
         )
 
 
-def render_token_usage(usage: list):
+def render_token_usage(usage: dict):
     if not usage:
         st.write("No token usage data available.")
         return
 
-    by_node = defaultdict(lambda: {"input": 0, "output": 0})
-    total_in = total_out = 0
-    for t in usage:
-        by_node[t.node]["input"] += t.input_tokens
-        by_node[t.node]["output"] += t.output_tokens
-        total_in += t.input_tokens
-        total_out += t.output_tokens
+    total = total_usage(usage)
 
-    c1, c2, c3 = st.columns(3)
-    c1.metric("Input Tokens", f"{total_in:,}")
-    c2.metric("Output Tokens", f"{total_out:,}")
-    c3.metric("Total", f"{total_in + total_out:,}")
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Input Tokens", f"{total.input_tokens:,}")
+    c2.metric("Output Tokens", f"{total.output_tokens:,}")
+    c3.metric("Model Time", f"{total.latency:.1f}s")
+    c4.metric("Est. Cost", f"${total.cost:.4f}")
 
     rows = [
         {
             "Node": node,
-            "Input": f"{c['input']:,}",
-            "Output": f"{c['output']:,}",
-            "Total": f"{c['input'] + c['output']:,}",
+            "Calls": u.calls,
+            "Input": f"{u.input_tokens:,}",
+            "Output": f"{u.output_tokens:,}",
+            "Cached": f"{u.cached_tokens:,}",
+            "Prompt Cache": f"{u.cache_hit_ratio:.0%}",
+            "Latency": f"{u.latency:.1f}s",
+            "Queued": f"{u.queue_wait:.1f}s",
+            "Cost": f"${u.cost:.4f}",
         }
-        for node, c in sorted(by_node.items())
+        for node, u in sorted(usage.items())
     ]
     st.dataframe(pd.DataFrame(rows), hide_index=True, width="stretch")
 
@@ -269,7 +292,7 @@ def _update_progress_for_chunk(
         if 2 not in st.session_state.completed_stages:
             st.session_state.completed_stages.append(2)
         st.session_state.active_stage = 3
-    elif node_name == "worker":
+    elif node_name in ("worker", "section_pipeline"):
         worker_count += 1
         if total_workers:
             st.session_state.stage_details[3] = f"{worker_count}/{total_workers}"
@@ -278,8 +301,12 @@ def _update_progress_for_chunk(
     elif node_name == "reducer":
         st.session_state.stage_details[5] = "finalizing"
     elif node_name == "evaluator":
-        feedback = chunk_data.get("evaluator", {}).get("eval_feedback", "")
-        if not feedback:
+        result = chunk_data.get("evaluator", {})
+        feedback = result.get("eval_feedback", "")
+        failing = len(result.get("section_feedback", {}))
+        if failing:
+            st.session_state.stage_details[6] = f"revising {failing} section(s)"
+        elif not feedback:
             st.session_state.stage_details[6] = "passed"
         else:
             brief = feedback[:60] + "..." if len(feedback) > 60 else feedback
@@ -310,14 +337,45 @@ def _handle_stream_end(app, config):
     else:
         final_values = state.values
         st.session_state.final_blog = final_values.get("final", "")
-        st.session_state.token_usage = final_values.get("token_usage", [])
+        st.session_state.token_usage = final_values.get("token_usage", {})
         st.session_state.completed_stages = list(range(len(STAGES)))
         st.session_state.active_stage = None
         st.session_state.phase = "done"
         return False
 
 
-def run_stream(input_data, progress_placeholder):
+def render_draft(placeholder, label: str, text: str):
+    with placeholder.container(border=True):
+        st.caption(label)
+        st.markdown(text)
+
+
+def resume_thread(thread_id: str):
+    """Load a checkpointed thread and continue from wherever it stopped."""
+    st.session_state.graph = new_graph()
+    st.session_state.config = {"configurable": {"thread_id": thread_id}}
+    app, config = st.session_state.graph, st.session_state.config
+
+    state = run_async(app.aget_state(config))
+    if not state.values:
+        st.session_state.error = f"No checkpoint found for thread {thread_id}"
+        st.session_state.phase = "error"
+        return
+
+    st.session_state.topic = state.values.get("topic", "")
+    st.session_state.plan = state.values.get("plan")
+    st.session_state.stage_details = {}
+    st.session_state.generation_time = 0.0
+    if state.next and not state.interrupts:
+        st.session_state.completed_stages = []
+        st.session_state.active_stage = None
+        st.session_state.resume_value = None
+        st.session_state.phase = "streaming"
+    else:
+        _handle_stream_end(app, config)
+
+
+def run_stream(input_data, progress_placeholder, drafts_container=None):
     app = st.session_state.graph
     config = st.session_state.config
     plan = st.session_state.plan
@@ -328,11 +386,38 @@ def run_stream(input_data, progress_placeholder):
     researcher_count = 0
     worker_count = 0
 
+    drafts: dict[str, str] = defaultdict(str)
+    draft_slots: dict[str, object] = {}
+    last_drawn: dict[str, float] = {}
+
+    def _draw(label: str):
+        now = time.monotonic()
+        if now - last_drawn.get(label, 0.0) < DRAFT_REFRESH:
+            return
+        if label not in draft_slots:
+            draft_slots[label] = drafts_container.empty()
+        render_draft(draft_slots[label], label, drafts[label])
+        last_drawn[label] = now
+
     async def _stream():
         nonlocal researcher_count, worker_count
-        async for chunk in app.astream(
-            input_data, config=config, stream_mode="updates"
+        async for namespace, mode, chunk in app.astream(
+            input_data,
+            config=config,
+            stream_mode=["updates", "messages"],
+            subgraphs=True,
         ):
+            if mode == "messages":
+                token = draft_token(*chunk)
+                if token and drafts_container is not None:
+                    label, text = token
+                    drafts[label] += text
+                    _draw(label)
+                continue
+            if namespace:
+                # Section subgraph internals; the parent's section_pipeline
+                # update reports the section once it is done.
+                continue
             node_name = list(chunk.keys())[0]
             researcher_count, worker_count = _update_progress_for_chunk(
                 node_name, chunk, progress_placeholder, researcher_count, worker_count, totals
@@ -358,6 +443,23 @@ with st.sidebar:
         reset_session()
         st.rerun()
 
+    st.selectbox(
+        "Diagram renderer",
+        sorted(RENDERERS),
+        index=sorted(RENDERERS).index(app_config.DIAGRAM_RENDERER),
+        key="diagram_renderer",
+        disabled=st.session_state.phase not in ("idle", "viewing"),
+    )
+
+    if app_config.CHECKPOINT_PATH:
+        with st.form("resume_form", border=False):
+            thread_to_resume = st.text_input("Resume thread", placeholder="Thread ID")
+            if st.form_submit_button("Resume", width="stretch") and thread_to_resume.strip():
+                resume_thread(thread_to_resume.strip())
+                st.rerun()
+        if st.session_state.config:
+            st.caption(f"Thread: {st.session_state.config['configurable']['thread_id']}")
+
     st.markdown("---")
 
     blog_files = (
@@ -468,7 +570,7 @@ elif st.session_state.phase == "planning":
 
     # Lazy init — build graph after progress is already visible
     if st.session_state.graph is None:
-        st.session_state.graph = build_graph()
+        st.session_state.graph = new_graph()
         st.session_state.config = {"configurable": {"thread_id": str(uuid.uuid4())}}
 
     try:
@@ -478,7 +580,10 @@ elif st.session_state.phase == "planning":
             app = st.session_state.graph
             config = st.session_state.config
             async for chunk in app.astream(
-                {"topic": st.session_state.topic},
+                {
+                    "topic": st.session_state.topic,
+                    "diagram_renderer": st.session_state.diagram_renderer,
+                },
                 config=config,
                 stream_mode="updates",
             ):
@@ -625,9 +730,11 @@ elif st.session_state.phase == "streaming":
     try:
         start_time = time.time()
 
+        resume_value = st.session_state.resume_value
         run_stream(
-            Command(resume=st.session_state.resume_value),
+            Command(resume=resume_value) if resume_value is not None else None,
             progress_placeholder,
+            drafts_container=st.container(),
         )
 
         elapsed = time.time() - start_time
@@ -655,7 +762,7 @@ elif st.session_state.phase == "done":
 
     title = plan.blog_title if plan else st.session_state.topic
 
-    total_tokens = sum(t.total_tokens for t in st.session_state.token_usage)
+    total_tokens = total_usage(st.session_state.token_usage).total_tokens
 
     meta_items = [f"{word_count:,} words", f"{section_count} sections"]
     if research_count:
@@ -693,6 +800,9 @@ elif st.session_state.phase == "done":
         icon=":material/download:",
     )
 
+    with st.expander("Usage"):
+        render_token_usage(st.session_state.token_usage)
+
 # ------------------------------------------------------------------
 # ERROR
 # ------------------------------------------------------------------